@@ -26,7 +26,8 @@ class ExpectedGoalsCalculator:
         
     def get_player_xg_analysis(self, player_name: Optional[str] = None, 
                               season: Optional[str] = None,
-                              team: Optional[str] = None) -> pd.DataFrame:
+                              team: Optional[str] = None,
+                              limit: Optional[int] = None) -> pd.DataFrame:
         """
         Get comprehensive xG analysis for players
         
@@ -34,6 +35,7 @@ class ExpectedGoalsCalculator:
             player_name: Specific player to analyze (optional)
             season: Season to filter (optional) 
             team: Team to filter (optional)
+            limit: Only return the top players by xG (optional)
             
         Returns:
             DataFrame with xG analysis including efficiency metrics
@@ -60,6 +62,8 @@ class ExpectedGoalsCalculator:
         
         where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
         
+        limit_clause = f"LIMIT {int(limit)}" if limit else ""
+        
         query = f"""
         SELECT 
           Player as player_name,
@@ -116,6 +120,7 @@ class ExpectedGoalsCalculator:
         FROM `{self.project_id}.nwsl_fbref.player_stats_all_years`
         {where_clause}
         ORDER BY EXP_xG DESC, goals DESC
+        {limit_clause}
         """
         
         return self.client.query(query).to_dataframe()
@@ -224,13 +229,20 @@ class ExpectedGoalsCalculator:
         
         return result
     
-    def find_xg_overperformers(self, season: str, min_minutes: int = 900) -> pd.DataFrame:
+    def find_xg_overperformers(self, season: str, min_minutes: int = 900,
+                               limit: Optional[int] = None) -> pd.DataFrame:
         """
         Find players who significantly over/under-perform their xG
         
         Research Focus: How do we separate skill from luck?
+        
+        With a limit, only the top and bottom `limit` players by goals vs
+        expected are returned, so both ends of the table survive.
         """
         
+        extremes_clause = f"""QUALIFY ROW_NUMBER() OVER (ORDER BY PERF_Gls - EXP_xG DESC) <= {int(limit)}
+          OR ROW_NUMBER() OVER (ORDER BY PERF_Gls - EXP_xG ASC) <= {int(limit)}""" if limit else ""
+        
         query = f"""
         SELECT 
           Player as player_name,
@@ -272,16 +284,19 @@ class ExpectedGoalsCalculator:
         WHERE season = {int(season)} 
           AND PT_Min >= {min_minutes}
           AND EXP_xG > 0.5  -- Minimum threshold for meaningful analysis
+        {extremes_clause}
         ORDER BY goals_vs_expected DESC
         """
         
         return self.client.query(query).to_dataframe()
     
-    def calculate_team_xg_efficiency(self, season: str) -> pd.DataFrame:
+    def calculate_team_xg_efficiency(self, season: str, limit: Optional[int] = None) -> pd.DataFrame:
         """
         Calculate team-level xG efficiency and goal generation patterns
         """
         
+        limit_clause = f"LIMIT {int(limit)}" if limit else ""
+        
         query = f"""
         SELECT 
           Squad as team_name,
@@ -318,6 +333,7 @@ class ExpectedGoalsCalculator:
         WHERE season = {int(season)} AND Squad IS NOT NULL
         GROUP BY Squad
         ORDER BY total_xg DESC
+        {limit_clause}
         """
         
         return self.client.query(query).to_dataframe()
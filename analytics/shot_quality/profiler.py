@@ -24,18 +24,22 @@ class ShotQualityProfiler:
         self.project_id = project_id
         self.client = bigquery.Client(project=project_id)
         
-    def analyze_shooting_profiles(self, season: str, min_minutes: int = 450) -> pd.DataFrame:
+    def analyze_shooting_profiles(self, season: str, min_minutes: int = 450,
+                                  limit: Optional[int] = None) -> pd.DataFrame:
         """
         Analyze player shooting profiles and shot quality metrics
         
         Args:
             season: Season to analyze
             min_minutes: Minimum minutes played threshold
+            limit: Only return the top profiles by xG/90 (optional)
             
         Returns:
             DataFrame with comprehensive shooting analysis
         """
         
+        limit_clause = f"LIMIT {int(limit)}" if limit else ""
+        
         query = f"""
         WITH shooting_analysis AS (
           SELECT 
@@ -114,6 +118,7 @@ class ShotQualityProfiler:
         FROM shooting_analysis
         WHERE EXP_xG > 0  -- Only players with shooting data
         ORDER BY xg_per_90 DESC, shot_conversion_rate DESC
+        {limit_clause}
         """
         
         return self.client.query(query).to_dataframe()
@@ -200,13 +205,16 @@ class ShotQualityProfiler:
             }
         }
     
-    def find_shot_quality_leaders(self, season: str, min_shots: float = 2.0) -> pd.DataFrame:
+    def find_shot_quality_leaders(self, season: str, min_shots: float = 2.0,
+                                  limit: Optional[int] = None) -> pd.DataFrame:
         """
         Find players with the highest quality shot generation
         
         Research Focus: How do we separate skill from luck in shooting?
         """
         
+        limit_clause = f"LIMIT {int(limit)}" if limit else ""
+        
         query = f"""
         WITH shot_quality_analysis AS (
           SELECT 
@@ -273,15 +281,18 @@ class ShotQualityProfiler:
         FROM shot_quality_analysis
         WHERE estimated_xg_per_shot IS NOT NULL
         ORDER BY quality_volume_score DESC, estimated_xg_per_shot DESC
+        {limit_clause}
         """
         
         return self.client.query(query).to_dataframe()
     
-    def analyze_team_shooting_styles(self, season: str) -> pd.DataFrame:
+    def analyze_team_shooting_styles(self, season: str, limit: Optional[int] = None) -> pd.DataFrame:
         """
         Analyze team-level shooting styles and patterns
         """
         
+        limit_clause = f"LIMIT {int(limit)}" if limit else ""
+        
         query = f"""
         WITH team_shooting AS (
           SELECT 
@@ -342,6 +353,7 @@ class ShotQualityProfiler:
           
         FROM team_shooting
         ORDER BY team_total_xg DESC
+        {limit_clause}
         """
         
         return self.client.query(query).to_dataframe()
@@ -0,0 +1,114 @@
+"""
+Shared FBref API helpers for the player data probe scripts
+"""
+
+import os
+import sys
+import logging
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import orjson
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Add src to path so we can import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from nwsl_analytics.utils.http import install_http_cache
+
+logger = logging.getLogger(__name__)
+
+API_KEY = os.getenv('FBREF_API_KEY', 'KvcVSKb_a49kmsKc6nnFAPfyaLPwLqiKm4VBxA2fvmY')
+BASE_URL = "https://fbrapi.com"
+HEADERS = {
+    "X-API-Key": API_KEY,
+    "Content-Type": "application/json",
+    "User-Agent": "NWSL-Analytics/1.0",
+    "Accept-Encoding": "gzip, deflate"
+}
+NWSL_LEAGUE_ID = "182"  # National Women's Soccer League
+USA_NAMES = frozenset({"usa", "united states"})
+
+
+def get_session() -> requests.Session:
+    """Pooled, retrying FBref session whose GETs are cached on disk"""
+    # Reruns while iterating are served from the on-disk cache
+    install_http_cache(expire_after=timedelta(hours=6))
+    
+    # One pooled session: TLS handshake paid once, transient errors retried
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry))
+    return session
+
+
+def get_data(session: requests.Session, endpoint: str, **params) -> List[Dict[str, Any]]:
+    """GET an endpoint and return its "data" records, raising on HTTP errors"""
+    response = session.get(f"{BASE_URL}/{endpoint}", params=params)
+    response.raise_for_status()
+    return orjson.loads(response.content).get("data", [])
+
+
+def get_countries(session: requests.Session) -> List[Dict[str, Any]]:
+    """All countries known to the API"""
+    return get_data(session, "countries")
+
+
+def find_nwsl_league_id(session: requests.Session,
+                        countries: Optional[List[Dict[str, Any]]] = None) -> Optional[str]:
+    """Look up the NWSL league id via the USA's domestic leagues"""
+    usa_code = next(
+        (country.get("country_code") for country in countries or get_countries(session)
+         if country.get("country", "").lower() in USA_NAMES),
+        None
+    )
+    if not usa_code:
+        logger.error("❌ Could not find USA country code")
+        return None
+    
+    league_data = get_data(session, "leagues", country_code=usa_code)
+    return next(
+        (league.get("league_id")
+         for league_type in league_data if league_type.get("league_type") == "domestic_leagues"
+         for league in league_type.get("leagues", [])
+         if "nwsl" in league.get("competition_name", "").lower()),
+        None
+    )
+
+
+def get_league_seasons(session: requests.Session, league_id: str) -> List[Dict[str, Any]]:
+    """Seasons available for a league"""
+    return get_data(session, "league-seasons", league_id=league_id)
+
+
+def get_player_season_stats(session: requests.Session, league_id: str,
+                            season_id: str) -> List[Dict[str, Any]]:
+    """Season-level stats for every player in a league season"""
+    return get_data(session, "player-season-stats", league_id=league_id, season_id=season_id)
+
+
+def get_player_match_stats(session: requests.Session, league_id: str,
+                           season_id: str) -> List[Dict[str, Any]]:
+    """Per-match stats for every player in a league season"""
+    return get_data(session, "all-players-match-stats", league_id=league_id, season_id=season_id)
+
+
+def split_fields(records: List[Dict[str, Any]],
+                 desired_fields: List[str]) -> Tuple[pd.DataFrame, List[str], List[str]]:
+    """Normalize records once and split desired fields into (available, missing)"""
+    players = pd.json_normalize(records, max_level=1)
+    columns = set(players.columns)
+    available = [field for field in desired_fields if field in columns]
+    missing = [field for field in desired_fields if field not in columns]
+    return players, available, missing
+
+
+def save_sample(records: List[Dict[str, Any]], filename: str, count: int):
+    """Write the first records to a JSON file for inspection"""
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(records[:count], option=orjson.OPT_INDENT_2))
+    logger.info(f"💾 Saved {count} player samples to {filename}")
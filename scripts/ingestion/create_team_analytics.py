@@ -15,22 +15,10 @@ def create_team_season_analytics():
     
     client = bigquery.Client(project="nwsl-data")
     
-    # Get all available seasons
+    # Get all available seasons from the season-partitioned player_stats table
     seasons_query = """
     SELECT DISTINCT season 
-    FROM `nwsl-data.nwsl_fbref.player_stats_2021`
-    UNION DISTINCT
-    SELECT DISTINCT season 
-    FROM `nwsl-data.nwsl_fbref.player_stats_2022`
-    UNION DISTINCT
-    SELECT DISTINCT season 
-    FROM `nwsl-data.nwsl_fbref.player_stats_2023`
-    UNION DISTINCT
-    SELECT DISTINCT season 
-    FROM `nwsl-data.nwsl_fbref.player_stats_2024`
-    UNION DISTINCT
-    SELECT DISTINCT season 
-    FROM `nwsl-data.nwsl_fbref.player_stats_2025`
+    FROM `nwsl-data.nwsl_fbref.player_stats_all_years`
     ORDER BY season
     """
     
@@ -117,8 +105,8 @@ def create_team_season_analytics():
           -- Data quality
           '{datetime.now().isoformat()}' as created_at
           
-        FROM `nwsl-data.nwsl_fbref.player_stats_{season}`
-        WHERE Squad IS NOT NULL
+        FROM `nwsl-data.nwsl_fbref.player_stats_all_years`
+        WHERE season = {int(season)} AND Squad IS NOT NULL
         GROUP BY Squad
         ORDER BY total_goals DESC
         """
@@ -144,13 +132,9 @@ def create_team_season_analytics():
     print(f"📤 Uploading to BigQuery: {table_id}")
     
     try:
-        combined_df.to_gbq(
-            destination_table=table_id,
-            project_id="nwsl-data",
-            if_exists='replace',
-            chunksize=1000,
-            progress_bar=False
-        )
+        job_config = bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE")
+        job = client.load_table_from_dataframe(combined_df, f"nwsl-data.{table_id}", job_config=job_config)
+        job.result()
         
         print(f"✅ Successfully uploaded {len(combined_df)} team season records")
         return True
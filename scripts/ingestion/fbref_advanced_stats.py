@@ -7,6 +7,8 @@ Gets all advanced stat categories: passing, passing_types, defense, possession,
 import requests
 import time
 import pandas as pd
+from functools import cached_property
+from google.cloud import bigquery
 from datetime import datetime
 
 class FBrefAdvancedStats:
@@ -25,6 +27,11 @@ class FBrefAdvancedStats:
             'keeper'
         ]
         
+    @cached_property
+    def bq_client(self):
+        """BigQuery client shared by every upload, created on first use"""
+        return bigquery.Client(project="nwsl-data")
+    
     def generate_api_key(self):
         """Generate a new API key"""
         print("🔑 Generating FBref API key...")
@@ -313,13 +320,9 @@ class FBrefAdvancedStats:
         print(f"📤 Uploading {category} to {table_id}")
         
         try:
-            df.to_gbq(
-                destination_table=table_id,
-                project_id=project_id,
-                if_exists='replace',
-                chunksize=1000,
-                progress_bar=False
-            )
+            job_config = bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE")
+            job = self.bq_client.load_table_from_dataframe(df, f"{project_id}.{table_id}", job_config=job_config)
+            job.result()
             
             print(f"✅ Upload successful: {len(df)} records")
             return True
@@ -1,25 +1,47 @@
 
 #!/usr/bin/env python3
 import os
+import sys
 import requests
 import json
+import orjson
 import time
+from pathlib import Path
 import pandas as pd
 
-def get_fbref_data():
-    """Get player data from FBref API"""
-    api_key = os.getenv('FBREF_API_KEY', 'KvcVSKb_a49kmsKc6nnFAPfyaLPwLqiKm4VBxA2fvmY')
-    base_url = "https://fbrapi.com"
-    
-    headers = {
-        "X-API-Key": api_key,
-        "Content-Type": "application/json",
-        "User-Agent": "NWSL-Analytics/1.0"
-    }
-    
-    def rate_limit():
-        time.sleep(6)  # FBref rate limit
-    
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from nwsl_analytics.utils.dataframe import records_to_frame, sanitize_columns
+
+# League/season discovery results change rarely; reuse them between runs
+META_CACHE_FILE = Path.home() / ".cache" / "fbref" / "nwsl_meta.json"
+META_CACHE_TTL = 30 * 24 * 60 * 60  # 30 days
+
+def load_cached_meta():
+    """Return cached NWSL league id and seasons if the cache is fresh"""
+    try:
+        if time.time() - META_CACHE_FILE.stat().st_mtime > META_CACHE_TTL:
+            return None
+        return json.loads(META_CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        return None
+
+def save_cached_meta(meta):
+    """Persist NWSL league id and seasons for later runs"""
+    META_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    META_CACHE_FILE.write_text(json.dumps(meta))
+
+def find_nwsl(league_data):
+    """Return the first domestic league id whose name mentions NWSL"""
+    for league_type in league_data:
+        if league_type.get("league_type") == "domestic_leagues":
+            for league in league_type.get("leagues", []):
+                if "nwsl" in league.get("competition_name", "").lower():
+                    return league.get("league_id")
+    return None
+
+def discover_nwsl_meta(base_url, headers, rate_limit):
+    """Look up the NWSL league id and recent seasons via the FBref API"""
     # Find NWSL league ID
     print("🔍 Finding NWSL league...")
     
@@ -28,10 +50,10 @@ def get_fbref_data():
     response = requests.get(f"{base_url}/countries", headers=headers)
     if response.status_code == 401:
         print("❌ API key required for FBref")
-        return
+        return None
     
     response.raise_for_status()
-    countries = response.json().get("data", [])
+    countries = orjson.loads(response.content).get("data", [])
     
     usa_code = None
     for country in countries:
@@ -41,26 +63,19 @@ def get_fbref_data():
     
     if not usa_code:
         print("❌ Could not find USA")
-        return
+        return None
     
     # Get leagues
     rate_limit()
     response = requests.get(f"{base_url}/leagues", headers=headers, params={"country_code": usa_code})
     response.raise_for_status()
     
-    league_data = response.json().get("data", [])
-    nwsl_league_id = None
-    
-    for league_type in league_data:
-        if league_type.get("league_type") == "domestic_leagues":
-            for league in league_type.get("leagues", []):
-                if "nwsl" in league.get("competition_name", "").lower():
-                    nwsl_league_id = league.get("league_id")
-                    break
+    league_data = orjson.loads(response.content).get("data", [])
+    nwsl_league_id = find_nwsl(league_data)
     
     if not nwsl_league_id:
         print("❌ Could not find NWSL league")
-        return
+        return None
     
     print(f"✅ Found NWSL league: {nwsl_league_id}")
     
@@ -69,9 +84,37 @@ def get_fbref_data():
     response = requests.get(f"{base_url}/league-seasons", headers=headers, params={"league_id": nwsl_league_id})
     response.raise_for_status()
     
-    seasons = response.json().get("data", [])
+    seasons = orjson.loads(response.content).get("data", [])
     recent_seasons = [s for s in seasons if s.get("season_id") and s.get("season_id").isdigit() and int(s.get("season_id")) >= 2020]
     
+    return {"nwsl_league_id": nwsl_league_id, "recent_seasons": recent_seasons}
+
+def get_fbref_data():
+    """Get player data from FBref API"""
+    api_key = os.getenv('FBREF_API_KEY', 'KvcVSKb_a49kmsKc6nnFAPfyaLPwLqiKm4VBxA2fvmY')
+    base_url = "https://fbrapi.com"
+    
+    headers = {
+        "X-API-Key": api_key,
+        "Content-Type": "application/json",
+        "User-Agent": "NWSL-Analytics/1.0"
+    }
+    
+    def rate_limit():
+        time.sleep(6)  # FBref rate limit
+    
+    meta = load_cached_meta()
+    if meta:
+        print(f"✅ Using cached NWSL league: {meta['nwsl_league_id']}")
+    else:
+        meta = discover_nwsl_meta(base_url, headers, rate_limit)
+        if not meta:
+            return
+        save_cached_meta(meta)
+    
+    nwsl_league_id = meta["nwsl_league_id"]
+    recent_seasons = meta["recent_seasons"]
+    
     print(f"📅 Found {len(recent_seasons)} recent seasons")
     
     # Get player data for recent seasons
@@ -85,14 +128,14 @@ def get_fbref_data():
                               params={"league_id": nwsl_league_id, "season_id": season_id})
         
         if response.status_code == 200:
-            data = response.json().get("data", [])
+            data = orjson.loads(response.content).get("data", [])
             if data:
-                df = pd.DataFrame(data)
+                df = records_to_frame(data)
                 df['season_id'] = season_id
                 df['ingestion_date'] = pd.Timestamp.now()
                 
                 # Clean column names
-                df.columns = [col.replace(' ', '_').replace('-', '_').replace('.', '_').replace('/', '_').replace('%', '_pct').replace('(', '').replace(')', '').replace('+', '_plus').lower() for col in df.columns]
+                df.columns = sanitize_columns(df.columns)
                 
                 # Save to CSV
                 filename = f"fbref_player_stats_{season_id}.csv"
@@ -105,14 +148,14 @@ def get_fbref_data():
                               params={"league_id": nwsl_league_id, "season_id": season_id})
         
         if response.status_code == 200:
-            data = response.json().get("data", [])
+            data = orjson.loads(response.content).get("data", [])
             if data:
-                df = pd.DataFrame(data)
+                df = records_to_frame(data)
                 df['season_id'] = season_id
                 df['ingestion_date'] = pd.Timestamp.now()
                 
                 # Clean column names
-                df.columns = [col.replace(' ', '_').replace('-', '_').replace('.', '_').replace('/', '_').replace('%', '_pct').replace('(', '').replace(')', '').replace('+', '_plus').lower() for col in df.columns]
+                df.columns = sanitize_columns(df.columns)
                 
                 # Save to CSV
                 filename = f"fbref_player_match_stats_{season_id}.csv"
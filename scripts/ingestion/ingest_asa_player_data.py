@@ -18,6 +18,7 @@ from google.cloud import bigquery
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from nwsl_analytics.config.settings import settings
+from nwsl_analytics.utils.dataframe import sanitize_columns
 
 # Setup logging
 logging.basicConfig(
@@ -194,19 +195,7 @@ class ASAPlayerDataIngester:
             return df
             
         # Clean column names
-        df.columns = [
-            col.replace(' ', '_')
-               .replace('-', '_')
-               .replace('.', '_')
-               .replace('/', '_')
-               .replace('%', '_pct')
-               .replace('(', '')
-               .replace(')', '')
-               .replace('+', '_plus')
-               .replace('#', 'num')
-               .lower()
-            for col in df.columns
-        ]
+        df.columns = sanitize_columns(df.columns)
         
         # Remove duplicate columns
         df = df.loc[:, ~df.columns.duplicated()]
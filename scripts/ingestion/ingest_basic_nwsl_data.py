@@ -16,6 +16,8 @@ import json
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from nwsl_analytics.utils.dataframe import sanitize_columns
+
 # Import itscalledsoccer
 try:
     from itscalledsoccer.client import AmericanSoccerAnalysis
@@ -159,19 +161,7 @@ def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     
     # Clean column names for BigQuery
-    df.columns = [
-        col.replace(' ', '_')
-           .replace('-', '_')
-           .replace('.', '_')
-           .replace('/', '_')
-           .replace('%', '_pct')
-           .replace('(', '')
-           .replace(')', '')
-           .replace('+', '_plus')
-           .replace('#', 'num')
-           .lower()
-        for col in df.columns
-    ]
+    df.columns = sanitize_columns(df.columns)
     
     # Add ingestion metadata
     df['ingestion_date'] = pd.Timestamp.now()
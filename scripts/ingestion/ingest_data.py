@@ -5,6 +5,7 @@ Professional data pipeline from American Soccer Analysis to BigQuery
 """
 
 import sys
+import argparse
 import logging
 from pathlib import Path
 
@@ -24,9 +25,14 @@ logger = logging.getLogger(__name__)
 
 def main():
     """Main ingestion function"""
+    parser = argparse.ArgumentParser(description="Ingest NWSL data from ASA and FBref")
+    parser.add_argument('--per-season-tables', action='store_true',
+                        help="Also write the per-season FBref nwsl_*_<season_id> tables the MCP servers read")
+    args = parser.parse_args()
+    
     logger.info("🚀 Starting NWSL data ingestion...")
     logger.info(f"📊 Project: {settings.gcp_project_id}")
-    logger.info(f"📅 Seasons: {settings.seasons_list}")
+    logger.info(f"📅 Seasons: {settings.nwsl_seasons}")
     
     # Create clients
     asa_client = ASAClient(settings.gcp_project_id, settings.bigquery_dataset_id)
@@ -75,7 +81,8 @@ def main():
             fbref_seasons = fbref_client.get_league_seasons()
             logger.info(f"📅 Found {len(fbref_seasons)} FBref seasons for NWSL")
             
-            # Ingest each season
+            # Collect the in-range seasons; they are loaded together below
+            fbref_season_ids = []
             for season_data in fbref_seasons:
                 season_id = season_data.get('id')
                 season_name = season_data.get('name', 'Unknown')
@@ -88,23 +95,29 @@ def main():
                 except:
                     pass
                 
+                fbref_season_ids.append(season_id)
+                
+                if not args.per_season_tables:
+                    continue
+                
                 try:
                     logger.info(f"⚽ Processing FBref season: {season_name} (ID: {season_id})")
                     
-                    # Add delay to respect rate limits
-                    import time
-                    time.sleep(2)  # 2 second delay between seasons
-                    
-                    season_stats = fbref_client.ingest_season_data(season_id)
-                    
-                    total_stats['tables_created'] += season_stats['tables_created']
-                    total_stats['total_rows'] += season_stats['total_rows']
-                    
-                    logger.info(f"✅ FBref Season {season_name} complete: {season_stats['total_rows']} rows")
+                    # Loads are collected by ingest_seasons() below
+                    fbref_client.ingest_season_data(season_id, flush=False)
                     
                 except Exception as e:
                     logger.error(f"❌ Failed to process FBref season {season_name}: {e}")
                     # Continue with other seasons
+            
+            # One load job per endpoint into the season-partitioned tables
+            logger.info(f"⚽ Loading {len(fbref_season_ids)} FBref seasons into combined tables...")
+            fbref_stats = fbref_client.ingest_seasons(fbref_season_ids)
+            
+            total_stats['tables_created'] += fbref_stats['tables_created']
+            total_stats['total_rows'] += fbref_stats['total_rows']
+            
+            logger.info(f"✅ FBref complete: {fbref_stats['total_rows']} rows")
         else:
             logger.error("❌ Could not find NWSL league in FBref API")
     
@@ -119,8 +132,8 @@ def main():
    bq query "SELECT COUNT(*) as total_teams FROM \`{settings.gcp_project_id}.{settings.bigquery_dataset_id}.nwsl_teams_all\`"
    
 📊 FBref tables (if available):
-   bq query "SELECT * FROM \`{settings.gcp_project_id}.{settings.bigquery_dataset_id}.nwsl_team_season_stats_*\` LIMIT 5"
-   bq query "SELECT * FROM \`{settings.gcp_project_id}.{settings.bigquery_dataset_id}.nwsl_player_season_stats_*\` LIMIT 5"
+   bq query "SELECT * FROM \`{settings.gcp_project_id}.{settings.bigquery_dataset_id}.nwsl_team_season_stats\` WHERE season = 2024 LIMIT 5"
+   bq query "SELECT * FROM \`{settings.gcp_project_id}.{settings.bigquery_dataset_id}.nwsl_player_season_stats\` WHERE season = 2024 LIMIT 5"
     """)
 
 if __name__ == "__main__":
@@ -96,8 +96,8 @@ def create_bigquery_schema():
         bigquery.SchemaField("ingestion_date", "STRING"),
     ]
 
-def upload_to_bigquery(df, dataset_id, table_id):
-    """Upload processed data to BigQuery"""
+def upload_to_bigquery(df, dataset_id, table_id, season):
+    """Replace one season's partition of the season-partitioned table"""
     print(f"🔧 Debug: Initializing BigQuery client...")
     client = bigquery.Client()
     print(f"🔧 Debug: Project: {client.project}")
@@ -106,39 +106,36 @@ def upload_to_bigquery(df, dataset_id, table_id):
     print(f"🔧 Debug: Creating table reference for {dataset_id}.{table_id}")
     table_ref = client.dataset(dataset_id).table(table_id)
     
-    # Configure load job
+    # Configure load job: the partition decorator limits WRITE_TRUNCATE to this
+    # season, matching the loads in process_all_player_data.py
     job_config = LoadJobConfig(
         schema=create_bigquery_schema(),
         write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
         autodetect=False,
+        range_partitioning=bigquery.RangePartitioning(
+            field="season",
+            range_=bigquery.PartitionRange(start=2000, end=2100, interval=1)
+        ),
+        schema_update_options=[
+            bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION,
+            bigquery.SchemaUpdateOption.ALLOW_FIELD_RELAXATION
+        ],
     )
     
-    print(f"📤 Uploading to BigQuery: {dataset_id}.{table_id}")
+    print(f"📤 Uploading to BigQuery: {dataset_id}.{table_id} (partition {season})")
     
-    try:
-        # Upload data directly from DataFrame
-        job = client.load_table_from_dataframe(df, table_ref, job_config=job_config)
-        job.result()  # Wait for job to complete
-        
-        print(f"✅ Successfully uploaded {len(df)} rows to {dataset_id}.{table_id}")
-        
-        # Show table info
-        table = client.get_table(table_ref)
-        print(f"📊 Table info: {table.num_rows} rows, {len(table.schema)} columns")
-        
-    except Exception as e:
-        print(f"❌ Upload failed: {e}")
-        # Try alternative upload method using pandas-gbq
-        print("🔄 Attempting alternative upload method...")
-        
-        table_full_name = f"{dataset_id}.{table_id}"
-        df.to_gbq(
-            destination_table=table_full_name,
-            project_id=client.project,
-            if_exists='replace',
-            chunksize=1000
-        )
-        print(f"✅ Successfully uploaded via pandas-gbq: {len(df)} rows")
+    # No pandas-gbq fallback: if_exists='replace' can't target one partition
+    # and would drop every other season
+    job = client.load_table_from_dataframe(
+        df, client.dataset(dataset_id).table(f"{table_id}${season}"), job_config=job_config
+    )
+    job.result()  # Wait for job to complete
+    
+    print(f"✅ Successfully uploaded {len(df)} rows to {dataset_id}.{table_id}")
+    
+    # Show table info
+    table = client.get_table(table_ref)
+    print(f"📊 Table info: {table.num_rows} rows, {len(table.schema)} columns")
 
 def main():
     """Main ingestion function"""
@@ -148,7 +145,8 @@ def main():
     # Configuration
     excel_file = "data/raw/excel/Player Standard Stats 2025 NWSL_rev.xlsx"
     dataset_id = "nwsl_fbref"
-    table_id = "player_stats_2025"
+    table_id = "player_stats"
+    season = 2025
     
     try:
         # Process Excel file
@@ -162,10 +160,11 @@ def main():
         # Upload to BigQuery
         print(f"🔧 Debug: About to upload to {dataset_id}.{table_id}")
         print(f"🔧 Debug: DataFrame shape: {df.shape}")
-        upload_to_bigquery(df, dataset_id, table_id)
+        upload_to_bigquery(df, dataset_id, table_id, season)
         
         print("\n🎉 Ingestion completed successfully!")
-        print(f"📊 Data available at: {dataset_id}.{table_id}")
+        print(f"📊 Data available at: {dataset_id}.{table_id} (partition {season}), "
+              f"and through {dataset_id}.player_stats_all_years")
         
     except Exception as e:
         print(f"❌ Error during ingestion: {e}")
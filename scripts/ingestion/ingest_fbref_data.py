@@ -6,7 +6,7 @@ Downloads professional NWSL statistics from FBref API to BigQuery
 
 import sys
 import os
-import time
+import argparse
 import logging
 from pathlib import Path
 
@@ -25,6 +25,11 @@ logger = logging.getLogger(__name__)
 
 def main():
     """Main FBref ingestion function"""
+    parser = argparse.ArgumentParser(description="Ingest NWSL data from the FBref API")
+    parser.add_argument('--per-season-tables', action='store_true',
+                        help="Also write the per-season nwsl_*_<season_id> tables the MCP servers read")
+    args = parser.parse_args()
+    
     logger.info("⚽ Starting NWSL FBref data ingestion...")
     logger.info(f"📊 Project: {settings.gcp_project_id}")
     logger.info(f"💾 Dataset: {settings.bigquery_dataset_id}")
@@ -102,7 +107,8 @@ def main():
     
     total_stats = {'tables_created': 0, 'total_rows': 0, 'seasons_processed': 0}
     
-    # Process each season
+    # Collect the in-range seasons; they are loaded together below
+    season_ids = []
     for i, season_data in enumerate(seasons):
         season_id = season_data.get('season_id')
         season_name = f"{season_data.get('season_id')} {season_data.get('competition_name', 'NWSL')}"
@@ -122,31 +128,34 @@ def main():
             logger.warning(f"⚠️ Could not parse year from season_id: {season_id}")
             continue
         
+        season_ids.append(season_id)
+        
+        if not args.per_season_tables:
+            continue
+        
         logger.info(f"\n{'='*60}")
         logger.info(f"📅 Processing season {i+1}/{len(seasons)}: {season_name}")
         logger.info(f"{'='*60}")
         
         try:
-            # Add delay to respect rate limits (FBref requires 6 seconds between requests)
-            if i > 0:
-                logger.info("⏳ Waiting 6 seconds for FBref rate limit...")
-                time.sleep(6)
-            
-            # Ingest season data
-            season_stats = client.ingest_season_data(season_id)
-            
-            total_stats['tables_created'] += season_stats['tables_created']
-            total_stats['total_rows'] += season_stats['total_rows']
-            total_stats['seasons_processed'] += 1
-            
-            logger.info(f"✅ Season {season_name} complete!")
-            logger.info(f"   Tables: {season_stats['tables_created']}")
-            logger.info(f"   Rows: {season_stats['total_rows']:,}")
+            # Per-season tables (the client paces requests to FBref's rate limit).
+            # Uploads run in the background while the next season is fetched
+            client.ingest_season_data(season_id, flush=False)
+            logger.info(f"✅ Season {season_name} fetched, uploads queued")
             
         except Exception as e:
             logger.error(f"❌ Failed to process season {season_name}: {e}")
             # Continue with next season
     
+    # One load job per endpoint into the season-partitioned tables; this also
+    # waits for any per-season loads queued above
+    logger.info(f"⏳ Loading {len(season_ids)} seasons into combined tables...")
+    upload_stats = client.ingest_seasons(season_ids)
+    total_stats['seasons_processed'] = len(season_ids)
+    total_stats['tables_created'] += upload_stats['tables_created']
+    total_stats['total_rows'] += upload_stats['total_rows']
+    client.close()
+    
     # Summary
     logger.info(f"""
     
@@ -166,13 +175,13 @@ def main():
    bq ls {settings.gcp_project_id}:{settings.bigquery_dataset_id}
    
    # Team season stats
-   bq query "SELECT * FROM \`{settings.gcp_project_id}.{settings.bigquery_dataset_id}.nwsl_team_season_stats_*\` LIMIT 5"
+   bq query "SELECT * FROM \`{settings.gcp_project_id}.{settings.bigquery_dataset_id}.nwsl_team_season_stats\` WHERE season = 2024 LIMIT 5"
    
    # Player season stats (with xG!)
-   bq query "SELECT player_name, goals, xg, assists, xa FROM \`{settings.gcp_project_id}.{settings.bigquery_dataset_id}.nwsl_player_season_stats_*\` WHERE season_id = '2024' ORDER BY xg DESC LIMIT 10"
+   bq query "SELECT player_name, goals, xg, assists, xa FROM \`{settings.gcp_project_id}.{settings.bigquery_dataset_id}.nwsl_player_season_stats\` WHERE season = 2024 ORDER BY xg DESC LIMIT 10"
    
    # Match data
-   bq query "SELECT home_team, away_team, home_score, away_score, home_xg, away_xg FROM \`{settings.gcp_project_id}.{settings.bigquery_dataset_id}.nwsl_matches_*\` LIMIT 10"
+   bq query "SELECT home_team, away_team, home_score, away_score, home_xg, away_xg FROM \`{settings.gcp_project_id}.{settings.bigquery_dataset_id}.nwsl_matches\` WHERE season = 2024 LIMIT 10"
 
 💡 Next steps:
    1. Update MCP server to query from BigQuery instead of API
@@ -6,8 +6,12 @@ Uses itscalledsoccer library to get all available player data into BigQuery
 
 import sys
 import os
+import argparse
+import hashlib
+import json
 import logging
 import time
+from datetime import date
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 import pandas as pd
@@ -17,6 +21,7 @@ from google.cloud import bigquery
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from nwsl_analytics.config.settings import settings
+from nwsl_analytics.utils.dataframe import sanitize_columns
 
 # Import itscalledsoccer
 try:
@@ -32,10 +37,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Per-season player data types: (data_type, ASA method name, description)
+PLAYER_DATA_TYPES = [
+    ('goals_added', 'get_player_goals_added', 'Advanced player performance metrics'),
+    ('xgoals', 'get_player_xgoals', 'Expected goals statistics'),
+    ('xpass', 'get_player_xpass', 'Passing and creativity statistics'),
+    ('goalkeeper_goals_added', 'get_goalkeeper_goals_added', 'Goalkeeper performance metrics'),
+    ('goalkeeper_xgoals', 'get_goalkeeper_xgoals', 'Goalkeeper expected goals')
+]
+
 class NWSLPlayerStatsIngester:
     """Comprehensive NWSL player statistics ingestion using itscalledsoccer"""
     
-    def __init__(self, project_id: str, dataset_id: str = "nwsl_player_data"):
+    def __init__(self, project_id: str, dataset_id: str = "nwsl_player_data",
+                 force: bool = False):
         self.project_id = project_id
         self.dataset_id = dataset_id
         self.client = bigquery.Client(project=project_id)
@@ -43,9 +58,47 @@ class NWSLPlayerStatsIngester:
         # Create ASA client
         self.asa = AmericanSoccerAnalysis()
         
+        # Bind ASA methods once rather than looking them up per season
+        self._player_data_methods = [
+            (data_type, getattr(self.asa, method_name), description)
+            for data_type, method_name, description in PLAYER_DATA_TYPES
+        ]
+        
         # Seasons to process (as strings - required by ASA API)
         self.seasons = ['2024', '2025', '2023', '2022', '2021', '2020', '2019']
         
+        # Content hashes from the last successful upload of each endpoint/season;
+        # with force, every endpoint is uploaded regardless of what was recorded
+        self.force = force
+        self.state_file = Path(settings.cache_dir) / "asa_ingest_state.json"
+        self._ingest_state = self._load_ingest_state()
+        
+    def _load_ingest_state(self) -> Dict[str, str]:
+        """Load content hashes recorded by previous runs"""
+        try:
+            return json.loads(self.state_file.read_text())
+        except (OSError, ValueError):
+            return {}
+    
+    def _state_key(self, data_type: str, season: str) -> str:
+        """Key uploads by destination too, so a hash recorded for one
+        project/dataset never suppresses a load into another"""
+        return f"{self.project_id}.{self.dataset_id}:{data_type}:{season}"
+    
+    def _fingerprint(self, data: pd.DataFrame) -> str:
+        """Hash a raw ASA response so unchanged data can be detected"""
+        return hashlib.sha256(data.to_json(orient='split', index=False).encode()).hexdigest()
+    
+    def _is_unchanged(self, key: str, digest: str) -> bool:
+        """Check whether this data was already uploaded by a previous run"""
+        return not self.force and self._ingest_state.get(key) == digest
+    
+    def _mark_ingested(self, key: str, digest: str):
+        """Record the hash of successfully uploaded data"""
+        self._ingest_state[key] = digest
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self.state_file.write_text(json.dumps(self._ingest_state, indent=2))
+        
     def create_dataset_if_not_exists(self):
         """Create BigQuery dataset if it doesn't exist"""
         dataset_id = f"{self.project_id}.{self.dataset_id}"
@@ -119,31 +172,23 @@ class NWSLPlayerStatsIngester:
         """Ingest all player data for a specific season"""
         results = {'tables_created': 0, 'total_rows': 0}
         
-        # Player data types with their methods
-        player_data_types = [
-            ('goals_added', 'get_player_goals_added', 'Advanced player performance metrics'),
-            ('xgoals', 'get_player_xgoals', 'Expected goals statistics'),
-            ('xpass', 'get_player_xpass', 'Passing and creativity statistics'),
-            ('goalkeeper_goals_added', 'get_goalkeeper_goals_added', 'Goalkeeper performance metrics'),
-            ('goalkeeper_xgoals', 'get_goalkeeper_xgoals', 'Goalkeeper expected goals')
-        ]
+        # (data_type, state key, digest, raw data) for everything that changed
+        pending = []
         
-        for data_type, method_name, description in player_data_types:
+        for data_type, method, description in self._player_data_methods:
             logger.info(f"   📊 {description}...")
             
             try:
-                method = getattr(self.asa, method_name)
                 data = method(leagues=['nwsl'], seasons=[season])
                 
                 if data is not None and len(data) > 0:
-                    data_clean = self._clean_dataframe(data, data_type, season)
-                    table_name = f"nwsl_player_{data_type}_{season}"
-                    rows = self._upload_to_bigquery(data_clean, table_name)
+                    key = self._state_key(data_type, season)
+                    digest = self._fingerprint(data)
                     
-                    if rows > 0:
-                        results['total_rows'] += rows
-                        results['tables_created'] += 1
-                        logger.info(f"   ✅ {data_type}: {rows} rows → {table_name}")
+                    if self._is_unchanged(key, digest):
+                        logger.info(f"   ⏭️ {data_type}: unchanged since last run, skipping upload")
+                    else:
+                        pending.append((data_type, key, digest, data))
                 else:
                     logger.info(f"   ⚠️ {data_type}: No data for {season}")
                     
@@ -159,18 +204,36 @@ class NWSLPlayerStatsIngester:
             games = self.asa.get_games(leagues=['nwsl'], seasons=[season])
             
             if games is not None and len(games) > 0:
-                games_clean = self._clean_dataframe(games, 'games', season)
-                table_name = f"nwsl_games_{season}"
-                rows = self._upload_to_bigquery(games_clean, table_name)
+                key = self._state_key('games', season)
+                digest = self._fingerprint(games)
                 
-                if rows > 0:
-                    results['total_rows'] += rows
-                    results['tables_created'] += 1
-                    logger.info(f"   ✅ games: {rows} rows → {table_name}")
+                if self._is_unchanged(key, digest):
+                    logger.info(f"   ⏭️ games: unchanged since last run, skipping upload")
+                else:
+                    pending.append(('games', key, digest, games))
                     
         except Exception as e:
             logger.warning(f"   ❌ Games failed for {season}: {e}")
         
+        # Submit every load job for the season before waiting on any of them,
+        # so BigQuery runs them side by side instead of one per round trip
+        jobs = []
+        for data_type, key, digest, data in pending:
+            table_name = "nwsl_games" if data_type == 'games' else f"nwsl_player_{data_type}"
+            data_clean = self._clean_dataframe(data, data_type, season)
+            job = self._start_upload(data_clean, table_name, season=season)
+            if job is not None:
+                jobs.append((data_type, key, digest, table_name, len(data_clean), job))
+        
+        for data_type, key, digest, table_name, row_count, job in jobs:
+            rows = self._wait_for_upload(job, row_count, table_name)
+            
+            if rows > 0:
+                self._mark_ingested(key, digest)
+                results['total_rows'] += rows
+                results['tables_created'] += 1
+                logger.info(f"   ✅ {data_type}: {rows} rows → {table_name} ({season} partition)")
+        
         return results
     
     def _clean_dataframe(self, df: pd.DataFrame, data_type: str, season: str) -> pd.DataFrame:
@@ -180,51 +243,78 @@ class NWSLPlayerStatsIngester:
         df = df.copy()
         df['data_type'] = data_type
         df['target_season'] = season
+        if season.isdigit():
+            df['target_season_date'] = date(int(season), 1, 1)
         df['data_source'] = 'ASA_itscalledsoccer'
         df['ingestion_date'] = pd.Timestamp.now()
         
         # Clean column names for BigQuery
-        df.columns = [
-            col.replace(' ', '_')
-               .replace('-', '_')
-               .replace('.', '_')
-               .replace('/', '_')
-               .replace('%', '_pct')
-               .replace('(', '')
-               .replace(')', '')
-               .replace('+', '_plus')
-               .replace('±', '_pm')
-               .replace('#', 'num')
-               .lower()
-            for col in df.columns
-        ]
+        df.columns = sanitize_columns(df.columns)
         
-        # Remove any problematic characters and ensure no duplicates
-        df.columns = [col.replace('__', '_').strip('_') for col in df.columns]
+        # Ensure no duplicates
         df = df.loc[:, ~df.columns.duplicated()]
         
         return df
     
-    def _upload_to_bigquery(self, df: pd.DataFrame, table_name: str) -> int:
+    def _upload_to_bigquery(self, df: pd.DataFrame, table_name: str,
+                            season: Optional[str] = None) -> int:
         """Upload DataFrame to BigQuery"""
+        job = self._start_upload(df, table_name, season=season)
+        if job is None:
+            return 0
+        return self._wait_for_upload(job, len(df), table_name)
+    
+    def _start_upload(self, df: pd.DataFrame, table_name: str,
+                      season: Optional[str] = None) -> Optional[bigquery.LoadJob]:
+        """Submit a load job without waiting for it to finish
+        
+        With a season, only that season's partition of the yearly-partitioned
+        table is replaced; other seasons are left untouched.
+        """
         
         if df is None or len(df) == 0:
-            return 0
+            return None
         
         try:
             table_id = f"{self.project_id}.{self.dataset_id}.{table_name}"
             
-            job_config = bigquery.LoadJobConfig(
-                write_disposition="WRITE_TRUNCATE",  # Replace table each time
-                autodetect=True,
-                create_disposition="CREATE_IF_NEEDED"
-            )
+            if season:
+                # Partition decorator: WRITE_TRUNCATE only rewrites this season
+                table_id = f"{table_id}${season}"
+                job_config = bigquery.LoadJobConfig(
+                    write_disposition="WRITE_TRUNCATE",
+                    create_disposition="CREATE_IF_NEEDED",
+                    time_partitioning=bigquery.TimePartitioning(
+                        type_=bigquery.TimePartitioningType.YEAR,
+                        field="target_season_date"
+                    ),
+                    # A partition-scoped truncate can't replace the table schema,
+                    # so let ASA add or loosen columns from season to season
+                    schema_update_options=[
+                        bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION,
+                        bigquery.SchemaUpdateOption.ALLOW_FIELD_RELAXATION,
+                    ]
+                )
+            else:
+                job_config = bigquery.LoadJobConfig(
+                    write_disposition="WRITE_TRUNCATE",  # Replace table each time
+                    autodetect=True,
+                    create_disposition="CREATE_IF_NEEDED"
+                )
+            
+            return self.client.load_table_from_dataframe(df, table_id, job_config=job_config)
             
-            job = self.client.load_table_from_dataframe(df, table_id, job_config=job_config)
+        except Exception as e:
+            logger.error(f"❌ Upload failed for {table_name}: {e}")
+            return None
+    
+    def _wait_for_upload(self, job: bigquery.LoadJob, row_count: int, table_name: str) -> int:
+        """Block until a submitted load job finishes"""
+        try:
             job.result()  # Wait for completion
             
-            logger.info(f"✅ Uploaded {len(df)} rows to {table_name}")
-            return len(df)
+            logger.info(f"✅ Uploaded {row_count} rows to {table_name}")
+            return row_count
             
         except Exception as e:
             logger.error(f"❌ Upload failed for {table_name}: {e}")
@@ -350,6 +440,10 @@ def test_without_bigquery():
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Ingest NWSL player data via itscalledsoccer")
+    parser.add_argument('--force', action='store_true',
+                        help="Upload every endpoint even if its data is unchanged since the last run")
+    args = parser.parse_args()
     
     # Always test first
     test_results = test_without_bigquery()
@@ -360,7 +454,8 @@ def main():
         
         ingester = NWSLPlayerStatsIngester(
             project_id=settings.gcp_project_id,
-            dataset_id="nwsl_player_data"
+            dataset_id="nwsl_player_data",
+            force=args.force
         )
         
         # Show available fields
@@ -391,10 +486,10 @@ def main():
    bq query "SELECT player_name, primary_general_position, nationality FROM \\`{settings.gcp_project_id}.nwsl_player_data.nwsl_players_roster\\` LIMIT 10"
    
    # Player performance (goals added)
-   bq query "SELECT player_name, team_name, goals_added_above_avg FROM \\`{settings.gcp_project_id}.nwsl_player_data.nwsl_player_goals_added_2024\\` ORDER BY goals_added_above_avg DESC LIMIT 10"
+   bq query "SELECT player_name, team_name, goals_added_above_avg FROM \\`{settings.gcp_project_id}.nwsl_player_data.nwsl_player_goals_added\\` WHERE target_season = '2024' ORDER BY goals_added_above_avg DESC LIMIT 10"
    
    # Expected goals leaders
-   bq query "SELECT player_name, team_name, goals, xgoals FROM \\`{settings.gcp_project_id}.nwsl_player_data.nwsl_player_xgoals_2024\\` ORDER BY xgoals DESC LIMIT 10"
+   bq query "SELECT player_name, team_name, goals, xgoals FROM \\`{settings.gcp_project_id}.nwsl_player_data.nwsl_player_xgoals\\` WHERE target_season = '2024' ORDER BY xgoals DESC LIMIT 10"
 
 💡 Next steps:
    1. Update MCP server to include player statistics tables
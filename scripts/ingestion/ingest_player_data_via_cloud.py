@@ -32,6 +32,21 @@ import json
 import time
 import pandas as pd
 
+# Single-pass translation table for BigQuery-safe column names
+COLUMN_TRANS = str.maketrans({
+    ' ': '_', '-': '_', '.': '_', '/': '_',
+    '%': '_pct', '(': '', ')': '', '+': '_plus',
+})
+
+def find_nwsl(league_data):
+    """Return the first domestic league id whose name mentions NWSL"""
+    for league_type in league_data:
+        if league_type.get("league_type") == "domestic_leagues":
+            for league in league_type.get("leagues", []):
+                if "nwsl" in league.get("competition_name", "").lower():
+                    return league.get("league_id")
+    return None
+
 def get_fbref_data():
     """Get player data from FBref API"""
     api_key = os.getenv('FBREF_API_KEY', 'KvcVSKb_a49kmsKc6nnFAPfyaLPwLqiKm4VBxA2fvmY')
@@ -75,14 +90,7 @@ def get_fbref_data():
     response.raise_for_status()
     
     league_data = response.json().get("data", [])
-    nwsl_league_id = None
-    
-    for league_type in league_data:
-        if league_type.get("league_type") == "domestic_leagues":
-            for league in league_type.get("leagues", []):
-                if "nwsl" in league.get("competition_name", "").lower():
-                    nwsl_league_id = league.get("league_id")
-                    break
+    nwsl_league_id = find_nwsl(league_data)
     
     if not nwsl_league_id:
         print("❌ Could not find NWSL league")
@@ -118,7 +126,7 @@ def get_fbref_data():
                 df['ingestion_date'] = pd.Timestamp.now()
                 
                 # Clean column names
-                df.columns = [col.replace(' ', '_').replace('-', '_').replace('.', '_').replace('/', '_').replace('%', '_pct').replace('(', '').replace(')', '').replace('+', '_plus').lower() for col in df.columns]
+                df.columns = df.columns.str.translate(COLUMN_TRANS).str.lower()
                 
                 # Save to CSV
                 filename = f"fbref_player_stats_{season_id}.csv"
@@ -138,7 +146,7 @@ def get_fbref_data():
                 df['ingestion_date'] = pd.Timestamp.now()
                 
                 # Clean column names
-                df.columns = [col.replace(' ', '_').replace('-', '_').replace('.', '_').replace('/', '_').replace('%', '_pct').replace('(', '').replace(')', '').replace('+', '_plus').lower() for col in df.columns]
+                df.columns = df.columns.str.translate(COLUMN_TRANS).str.lower()
                 
                 # Save to CSV
                 filename = f"fbref_player_match_stats_{season_id}.csv"
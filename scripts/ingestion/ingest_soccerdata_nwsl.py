@@ -6,17 +6,28 @@ Comprehensive script to extract NWSL player statistics and load into BigQuery
 
 import sys
 import os
+import io
+import argparse
+import json
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from google.cloud import bigquery
 
 # Add src to path so we can import our modules
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from nwsl_analytics.config.settings import settings
+from nwsl_analytics.utils.dataframe import sanitize_columns
+from nwsl_analytics.utils.http import install_http_cache
 
 # Import soccerdata
 try:
@@ -32,14 +43,56 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class RateLimiter:
+    """Allow one request at a time with a minimum gap between them, across threads"""
+    
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._last_request = 0.0
+    
+    def __enter__(self):
+        self._lock.acquire()
+        wait_time = self._last_request + self.min_interval - time.monotonic()
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._last_request = time.monotonic()
+        self._lock.release()
+
+# Known-good league code per source, so normal runs skip the availability probe
+SOURCE_LEAGUE = {
+    'ESPN': 'USA-NWSL',
+    'FBref': 'USA-NWSL',
+    'FotMob': 'USA-NWSL'
+}
+SOURCE_LEAGUE_PRIMARY = ('ESPN', SOURCE_LEAGUE['ESPN'])
+
+# soccerdata reader class per source
+SCRAPERS = {
+    'ESPN': sd.ESPN,
+    'FBref': sd.FBref,
+    'FotMob': sd.FotMob
+}
+
+# FBref blocks bot traffic faster than one request every few seconds
+FBREF_RATE_LIMITER = RateLimiter(min_interval=3.0)
+
 class NWSLSoccerDataIngester:
     """Ingest NWSL player data using soccerdata library"""
     
-    def __init__(self, project_id: str, dataset_id: str = "nwsl_soccerdata"):
+    def __init__(self, project_id: str, dataset_id: str = "nwsl_soccerdata",
+                 cache_dir: Optional[str] = None, force_cache: bool = False):
         self.project_id = project_id
         self.dataset_id = dataset_id
         self.client = bigquery.Client(project=project_id)
         
+        # Scraped stats are cached as Parquet; force_cache reuses them regardless of age
+        self.cache_dir = Path(cache_dir or settings.cache_dir) / "soccerdata"
+        self.force_cache = force_cache
+        
         # Possible NWSL league identifiers to try
         self.nwsl_league_codes = [
             'USA-NWSL',
@@ -54,6 +107,14 @@ class NWSLSoccerDataIngester:
         # Data sources to try (in order of preference)
         self.data_sources = ['ESPN', 'FBref', 'FotMob']
         
+        # One scraper per (source, league, season), shared by stat-type threads
+        self._scrapers: Dict[tuple, Any] = {}
+        self._scrapers_lock = threading.Lock()
+        
+    def _request_slot(self, source: str):
+        """Pace scraper requests for sources that forbid concurrent access"""
+        return FBREF_RATE_LIMITER if source == 'FBref' else nullcontext()
+        
     def create_dataset_if_not_exists(self):
         """Create BigQuery dataset if it doesn't exist"""
         dataset_id = f"{self.project_id}.{self.dataset_id}"
@@ -69,8 +130,17 @@ class NWSLSoccerDataIngester:
             dataset = self.client.create_dataset(dataset, timeout=30)
             logger.info(f"✅ Created dataset {dataset_id}")
     
-    def test_nwsl_availability(self) -> Dict[str, Any]:
-        """Test which data sources have NWSL data"""
+    def test_nwsl_availability(self, use_cache: bool = True,
+                               max_age: timedelta = timedelta(days=7)) -> Dict[str, Any]:
+        """Test which data sources have NWSL data, reusing a recent probe result"""
+        cache_file = self.cache_dir / "availability.json"
+        
+        if use_cache and cache_file.exists():
+            age = datetime.now() - datetime.fromtimestamp(cache_file.stat().st_mtime)
+            if age < max_age:
+                logger.info(f"💾 Using cached availability from {cache_file}")
+                return json.loads(cache_file.read_text())
+        
         results = {
             'available_sources': [],
             'working_league_codes': {},
@@ -86,13 +156,8 @@ class NWSLSoccerDataIngester:
                 logger.info(f"   Trying league code: {league_code}")
                 
                 try:
-                    if source == 'ESPN':
-                        scraper = sd.ESPN(league_code, '2024')
-                    elif source == 'FBref':
-                        scraper = sd.FBref(league_code, '2024')
-                    elif source == 'FotMob':
-                        scraper = sd.FotMob(league_code, '2024')
-                    else:
+                    scraper = self._get_scraper(source, league_code, '2024')
+                    if scraper is None:
                         continue
                     
                     # Test basic functionality
@@ -146,117 +211,172 @@ class NWSLSoccerDataIngester:
                 except Exception as e:
                     logger.info(f"   ❌ {source} failed with {league_code}: {str(e)[:50]}...")
         
+        if results['available_sources']:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(json.dumps(results, indent=2))
+        
         return results
     
-    def ingest_player_data(self, source: str, league_code: str, season: str) -> Dict[str, int]:
-        """Ingest all available player data for a season"""
-        results = {'tables_created': 0, 'total_rows': 0}
+    def ingest_player_data(self, source: str, league_code: str, seasons: List[str]) -> Dict[str, int]:
+        """Ingest all available player data, one season-partitioned table per stat type"""
+        results = {'tables_created': 0, 'total_rows': 0, 'seasons_processed': 0}
+        frames_by_stat_type: Dict[str, List[pd.DataFrame]] = {}
         
-        logger.info(f"📅 Ingesting {source} player data for {season}...")
+        # Seasons are network-bound, so run them side by side
+        with ThreadPoolExecutor(max_workers=len(seasons)) as executor:
+            futures = {
+                executor.submit(self.collect_player_data, source, league_code, season): season
+                for season in seasons
+            }
+            
+            for future in as_completed(futures):
+                season = futures[future]
+                
+                try:
+                    season_frames = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Failed to process season {season}: {e}")
+                    continue
+                
+                if season_frames:
+                    results['seasons_processed'] += 1
+                    logger.info(f"✅ Season {season} collected: {len(season_frames)} stat types")
+                
+                for stat_type, df in season_frames.items():
+                    frames_by_stat_type.setdefault(stat_type, []).append(df)
+        
+        # One load job per stat type instead of one per (season, stat type)
+        for stat_type, frames in frames_by_stat_type.items():
+            table_name = f"nwsl_player_{stat_type}_stats"
+            player_stats = pd.concat(frames, ignore_index=True)
+            rows = self._upload_to_bigquery(player_stats, table_name, partition_field='season_date')
+            
+            if rows > 0:
+                results['tables_created'] += 1
+                results['total_rows'] += rows
+                logger.info(f"   ✅ {stat_type}: {rows} rows across {len(frames)} seasons → {table_name}")
+        
+        return results
+    
+    def collect_player_data(self, source: str, league_code: str, season: str) -> Dict[str, pd.DataFrame]:
+        """Fetch and clean every player stat type for a season, keyed by stat type"""
+        collected = {}
+        
+        logger.info(f"📅 Collecting {source} player data for {season}...")
         
         try:
-            # Create scraper
-            if source == 'ESPN':
-                scraper = sd.ESPN(league_code, season)
-            elif source == 'FBref':
-                scraper = sd.FBref(league_code, season)
-            elif source == 'FotMob':
-                scraper = sd.FotMob(league_code, season)
-            else:
-                return results
+            # Build the shared scraper up front so stat-type threads reuse it
+            if self._get_scraper(source, league_code, season) is None:
+                return collected
             
-            # Different stat types to try
+            # Different stat types to try ('general' is the unqualified read)
             stat_types = {
                 'standard': 'Basic player statistics',
                 'shooting': 'Shooting and finishing stats',
                 'passing': 'Passing accuracy and creativity',
                 'defense': 'Defensive actions and tackles',
                 'possession': 'Ball possession and dribbling',
-                'misc': 'Miscellaneous stats (cards, fouls, etc.)'
+                'misc': 'Miscellaneous stats (cards, fouls, etc.)',
+                'general': 'General player statistics'
             }
             
-            # Ingest each stat type
-            for stat_type, description in stat_types.items():
+            # Fetch every stat type concurrently; FBref is still paced by its limiter
+            with ThreadPoolExecutor(max_workers=len(stat_types)) as executor:
+                fetched = list(executor.map(
+                    lambda stat_type: self._fetch_player_stats(source, league_code, season, stat_type),
+                    stat_types
+                ))
+            
+            for stat_type, player_stats in fetched:
                 try:
-                    logger.info(f"   📊 Getting {stat_type} stats...")
-                    
-                    player_stats = scraper.read_player_season_stats(stat_type=stat_type)
-                    
-                    if not player_stats.empty:
-                        # Clean and prepare data
-                        player_stats = self._clean_dataframe(player_stats, season, source, stat_type)
-                        
-                        # Upload to BigQuery
-                        table_name = f"nwsl_player_{stat_type}_stats_{season}"
-                        rows = self._upload_to_bigquery(player_stats, table_name)
-                        
-                        if rows > 0:
-                            results['tables_created'] += 1
-                            results['total_rows'] += rows
-                            logger.info(f"   ✅ {stat_type}: {rows} rows → {table_name}")
+                    if player_stats is not None and not player_stats.empty:
+                        collected[stat_type] = self._clean_dataframe(player_stats, season, source, stat_type)
                         
                 except Exception as e:
                     logger.warning(f"   ⚠️ {stat_type} failed: {e}")
-            
-            # Also get basic player stats without stat_type
-            try:
-                logger.info(f"   📊 Getting general player stats...")
-                general_stats = scraper.read_player_season_stats()
                 
-                if not general_stats.empty:
-                    general_stats = self._clean_dataframe(general_stats, season, source, 'general')
-                    table_name = f"nwsl_player_general_stats_{season}"
-                    rows = self._upload_to_bigquery(general_stats, table_name)
-                    
-                    if rows > 0:
-                        results['tables_created'] += 1
-                        results['total_rows'] += rows
-                        logger.info(f"   ✅ general: {rows} rows → {table_name}")
-                        
-            except Exception as e:
-                logger.warning(f"   ⚠️ General stats failed: {e}")
+        except Exception as e:
+            logger.error(f"❌ Failed to collect {source} data for {season}: {e}")
+        
+        return collected
+    
+    def _get_scraper(self, source: str, league_code: str, season: str):
+        """Return one scraper per (source, league, season) so its session and cookies are reused"""
+        scraper_cls = SCRAPERS.get(source)
+        if scraper_cls is None:
+            return None
+        
+        key = (source, league_code, season)
+        with self._scrapers_lock:
+            if key not in self._scrapers:
+                # Keep soccerdata's own page cache on, underneath our Parquet cache
+                self._scrapers[key] = scraper_cls(league_code, season, no_cache=False, no_store=False)
+            return self._scrapers[key]
+    
+    def _fetch_player_stats(self, source: str, league_code: str, season: str, stat_type: str):
+        """Read one player stat type, returning (stat_type, DataFrame or None)"""
+        try:
+            logger.info(f"   📊 Getting {stat_type} stats...")
+            return stat_type, self._cached_read(source, league_code, season, stat_type)
                 
         except Exception as e:
-            logger.error(f"❌ Failed to ingest {source} data for {season}: {e}")
+            logger.warning(f"   ⚠️ {stat_type} failed: {e}")
+            return stat_type, None
+    
+    def _cached_read(self, source: str, league_code: str, season: str, stat_type: str,
+                     max_age: timedelta = timedelta(days=1)) -> pd.DataFrame:
+        """Read player season stats, reusing a recent Parquet copy from an earlier run"""
+        cache_file = self.cache_dir / source / league_code / season / f"{stat_type}.parquet"
         
-        return results
+        if cache_file.exists():
+            age = datetime.now() - datetime.fromtimestamp(cache_file.stat().st_mtime)
+            if self.force_cache or age < max_age:
+                logger.info(f"   💾 {stat_type}: using cached {cache_file}")
+                return pd.read_parquet(cache_file)
+        
+        scraper = self._get_scraper(source, league_code, season)
+        with self._request_slot(source):
+            if stat_type == 'general':
+                df = scraper.read_player_season_stats()
+            else:
+                df = scraper.read_player_season_stats(stat_type=stat_type)
+        
+        if not df.empty:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(cache_file, compression='zstd')
+        
+        return df
     
     def _clean_dataframe(self, df: pd.DataFrame, season: str, source: str, stat_type: str) -> pd.DataFrame:
-        """Clean DataFrame for BigQuery upload"""
+        """Clean DataFrame for BigQuery upload
+        
+        Note: consumes df in place; callers must not reuse the frame they pass in.
+        """
+        
+        # soccerdata keys rows by a named (league, season, team, player) index
+        if any(name is not None for name in df.index.names):
+            df = df.reset_index()
         
         # Add metadata columns
-        df = df.copy()
         df['season'] = season
+        df['season_date'] = date(int(season), 1, 1)
         df['data_source'] = source
         df['stat_type'] = stat_type
         df['ingestion_date'] = pd.Timestamp.now()
         
         # Clean column names for BigQuery
-        df.columns = [
-            col.replace(' ', '_')
-               .replace('-', '_')
-               .replace('.', '_')
-               .replace('/', '_')
-               .replace('%', '_pct')
-               .replace('(', '')
-               .replace(')', '')
-               .replace('+', '_plus')
-               .replace('±', '_pm')
-               .replace('#', 'num')
-               .lower()
-            for col in df.columns
-        ]
+        df.columns = sanitize_columns(df.columns)
         
-        # Remove any problematic characters
-        df.columns = [col.replace('__', '_').strip('_') for col in df.columns]
-        
-        # Ensure no duplicate columns
-        df = df.loc[:, ~df.columns.duplicated()]
+        # Ensure no duplicate columns (only slice, and copy, when there are some)
+        duplicated = df.columns.duplicated()
+        if duplicated.any():
+            df = df.loc[:, ~duplicated]
         
         return df
     
-    def _upload_to_bigquery(self, df: pd.DataFrame, table_name: str) -> int:
-        """Upload DataFrame to BigQuery"""
+    def _upload_to_bigquery(self, df: pd.DataFrame, table_name: str,
+                            partition_field: Optional[str] = None) -> int:
+        """Upload DataFrame to BigQuery, optionally as a yearly-partitioned table"""
         
         if df is None or len(df) == 0:
             return 0
@@ -264,13 +384,26 @@ class NWSLSoccerDataIngester:
         try:
             table_id = f"{self.project_id}.{self.dataset_id}.{table_name}"
             
+            # Parquet carries the schema, so BigQuery skips autodetection
+            buffer = io.BytesIO()
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), buffer, compression='snappy')
+            buffer.seek(0)
+            
             job_config = bigquery.LoadJobConfig(
+                source_format=bigquery.SourceFormat.PARQUET,
                 write_disposition="WRITE_TRUNCATE",  # Replace table each time
-                autodetect=True,
                 create_disposition="CREATE_IF_NEEDED"
             )
             
-            job = self.client.load_table_from_dataframe(df, table_id, job_config=job_config)
+            if partition_field:
+                job_config.time_partitioning = bigquery.TimePartitioning(
+                    type_=bigquery.TimePartitioningType.YEAR,
+                    field=partition_field
+                )
+                if 'team' in df.columns:
+                    job_config.clustering_fields = ['team']
+            
+            job = self.client.load_table_from_file(buffer, table_id, job_config=job_config)
             job.result()  # Wait for completion
             
             logger.info(f"✅ Uploaded {len(df)} rows to {table_name}")
@@ -282,6 +415,16 @@ class NWSLSoccerDataIngester:
 
 def main():
     """Main ingestion function"""
+    parser = argparse.ArgumentParser(description="Ingest NWSL player data via soccerdata")
+    parser.add_argument('--rediscover', action='store_true',
+                        help="Probe every source/league code instead of using SOURCE_LEAGUE_PRIMARY")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="With --rediscover, ignore the cached probe result")
+    args = parser.parse_args()
+    
+    # Repeated scraper requests across reruns are served from disk
+    install_http_cache()
+    
     logger.info("⚽ Starting NWSL soccerdata ingestion...")
     logger.info(f"📊 Project: {settings.gcp_project_id}")
     
@@ -294,48 +437,27 @@ def main():
     # Create dataset
     ingester.create_dataset_if_not_exists()
     
-    # Test availability
-    logger.info("🔍 Testing NWSL data availability...")
-    availability = ingester.test_nwsl_availability()
-    
-    if not availability['available_sources']:
-        logger.error("❌ No working data sources found for NWSL")
-        return
-    
-    logger.info(f"✅ Found working sources: {availability['available_sources']}")
-    
-    # Use the best available source
-    best_source = availability['available_sources'][0]
-    league_code = availability['working_league_codes'][best_source]
+    if args.rediscover:
+        # Test availability
+        logger.info("🔍 Testing NWSL data availability...")
+        availability = ingester.test_nwsl_availability(use_cache=not args.no_cache)
+        
+        if not availability['available_sources']:
+            logger.error("❌ No working data sources found for NWSL")
+            return
+        
+        logger.info(f"✅ Found working sources: {availability['available_sources']}")
+        
+        # Use the best available source
+        best_source = availability['available_sources'][0]
+        league_code = availability['working_league_codes'][best_source]
+    else:
+        best_source, league_code = SOURCE_LEAGUE_PRIMARY
     
     logger.info(f"🏆 Using {best_source} with league code: {league_code}")
     
-    # Ingest data for each season
-    total_stats = {'tables_created': 0, 'total_rows': 0, 'seasons_processed': 0}
-    
-    for season in ingester.seasons:
-        logger.info(f"\n{'='*60}")
-        logger.info(f"📅 Processing season {season}")
-        logger.info(f"{'='*60}")
-        
-        try:
-            season_stats = ingester.ingest_player_data(best_source, league_code, season)
-            
-            total_stats['tables_created'] += season_stats['tables_created']
-            total_stats['total_rows'] += season_stats['total_rows']
-            total_stats['seasons_processed'] += 1
-            
-            logger.info(f"✅ Season {season} complete!")
-            logger.info(f"   Tables: {season_stats['tables_created']}")
-            logger.info(f"   Rows: {season_stats['total_rows']:,}")
-            
-            # Add delay between seasons to be respectful
-            if season != ingester.seasons[-1]:
-                logger.info("⏳ Waiting 2 seconds...")
-                time.sleep(2)
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to process season {season}: {e}")
+    # Ingest data for all seasons
+    total_stats = ingester.ingest_player_data(best_source, league_code, ingester.seasons)
     
     # Summary
     logger.info(f"""
@@ -357,10 +479,10 @@ def main():
    bq ls {settings.gcp_project_id}:nwsl_soccerdata
    
    # Player standard stats
-   bq query "SELECT * FROM `{settings.gcp_project_id}.nwsl_soccerdata.nwsl_player_standard_stats_2024` LIMIT 5"
+   bq query "SELECT * FROM `{settings.gcp_project_id}.nwsl_soccerdata.nwsl_player_standard_stats` WHERE season = '2024' LIMIT 5"
    
    # Player shooting stats  
-   bq query "SELECT player, team, goals, shots, shots_on_target FROM `{settings.gcp_project_id}.nwsl_soccerdata.nwsl_player_shooting_stats_2024` ORDER BY goals DESC LIMIT 10"
+   bq query "SELECT player, team, goals, shots, shots_on_target FROM `{settings.gcp_project_id}.nwsl_soccerdata.nwsl_player_shooting_stats` WHERE season = '2024' ORDER BY goals DESC LIMIT 10"
 
 💡 Next steps:
    1. Update MCP server to include soccerdata player tables
@@ -6,12 +6,30 @@ Process all historical NWSL player statistics Excel files and upload to BigQuery
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 import re
+import sys
+from google.cloud import bigquery
+
+# Add src to path so we can import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from nwsl_analytics.data.views import MATERIALIZED_VIEWS, view_select
+
+PROJECT_ID = "nwsl-data"
+
+_YEAR_RE = re.compile(r'(\d{4})')
+
+@lru_cache(maxsize=1)
+def get_bigquery_client():
+    """BigQuery client shared by every upload in this run"""
+    return bigquery.Client(project=PROJECT_ID)
 
 def extract_year_from_filename(filename):
     """Extract year from Excel filename"""
-    match = re.search(r'(\d{4})', filename)
+    match = _YEAR_RE.search(filename)
     return int(match.group(1)) if match else None
 
 def clean_column_names(df):
@@ -24,8 +42,8 @@ def process_excel_file(file_path, year):
     print(f"📊 Processing {file_path.name} (Year: {year})")
     
     try:
-        # Read Excel file
-        df = pd.read_excel(file_path)
+        # Read Excel file (Rust-based calamine parser)
+        df = pd.read_excel(file_path, engine='calamine')
         
         # Clean column names
         df = clean_column_names(df)
@@ -42,10 +60,9 @@ def process_excel_file(file_path, year):
             'Born': 0
         })
         
-        # Convert numeric columns properly
+        # Fill numeric gaps in one block-level assignment (already numeric dtypes)
         numeric_cols = df.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        df[numeric_cols] = df[numeric_cols].fillna(0)
         
         print(f"✅ Processed {len(df)} players for {year}")
         return df
@@ -54,23 +71,33 @@ def process_excel_file(file_path, year):
         print(f"❌ Error processing {file_path.name}: {e}")
         return None
 
-def upload_to_bigquery(df, year):
-    """Upload year data to BigQuery"""
-    project_id = "nwsl-data"
-    table_id = f"nwsl_fbref.player_stats_{year}"
+def upload_to_bigquery(parquet_path, year, row_count):
+    """Replace a year's partition of the player_stats table with its Parquet file"""
+    table_id = f"{PROJECT_ID}.nwsl_fbref.player_stats"
     
-    print(f"📤 Uploading {year} data to BigQuery: {table_id}")
+    print(f"📤 Uploading {year} data to BigQuery: {table_id} (partition {year})")
     
     try:
-        df.to_gbq(
-            destination_table=table_id,
-            project_id=project_id,
-            if_exists='replace',
-            chunksize=1000,
-            progress_bar=False
+        # One Parquet load job per year, straight from the saved artifact.
+        # The partition decorator limits WRITE_TRUNCATE to this season.
+        job_config = bigquery.LoadJobConfig(
+            write_disposition="WRITE_TRUNCATE",
+            source_format=bigquery.SourceFormat.PARQUET,
+            range_partitioning=bigquery.RangePartitioning(
+                field="season",
+                range_=bigquery.PartitionRange(start=2000, end=2100, interval=1)
+            ),
+            # Yearly exports don't always have identical columns
+            schema_update_options=[
+                bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION,
+                bigquery.SchemaUpdateOption.ALLOW_FIELD_RELAXATION
+            ]
         )
+        with open(parquet_path, 'rb') as f:
+            job = get_bigquery_client().load_table_from_file(f, f"{table_id}${year}", job_config=job_config)
+        job.result()
         
-        print(f"✅ Successfully uploaded {len(df)} players for {year}")
+        print(f"✅ Successfully uploaded {row_count} players for {year}")
         return True
         
     except Exception as e:
@@ -78,29 +105,15 @@ def upload_to_bigquery(df, year):
         return False
 
 def create_unified_view():
-    """Create a unified view across all years"""
+    """Create the all-years view over the season-partitioned player_stats table"""
     print("🔗 Creating unified multi-year view...")
     
-    from google.cloud import bigquery
-    client = bigquery.Client(project="nwsl-data")
-    
-    # Get all player_stats tables
-    dataset = client.dataset("nwsl_fbref")
-    tables = list(dataset.list_tables())
-    player_tables = [table.table_id for table in tables if table.table_id.startswith('player_stats_')]
-    
-    if not player_tables:
-        print("❌ No player stats tables found")
-        return False
-    
-    # Create UNION ALL query
-    union_queries = []
-    for table in sorted(player_tables):
-        union_queries.append(f"SELECT * FROM `nwsl-data.nwsl_fbref.{table}`")
+    client = get_bigquery_client()
     
+    # Kept for existing queries; filters on season prune to one partition
     create_view_sql = f"""
-    CREATE OR REPLACE VIEW `nwsl-data.nwsl_fbref.player_stats_all_years` AS
-    {' UNION ALL '.join(union_queries)}
+    CREATE OR REPLACE VIEW `{PROJECT_ID}.nwsl_fbref.player_stats_all_years` AS
+    SELECT * FROM `{PROJECT_ID}.nwsl_fbref.player_stats`
     """
     
     try:
@@ -112,6 +125,28 @@ def create_unified_view():
         print(f"❌ Failed to create unified view: {e}")
         return False
 
+def create_materialized_views():
+    """Create the team aggregates the MCP server reads instead of re-scanning player_stats"""
+    print("🧮 Creating materialized team aggregates...")
+    
+    client = get_bigquery_client()
+    
+    # Same SELECTs the MCP server runs inline when a view is missing.
+    # BigQuery refreshes them incrementally after each partition load.
+    view_sqls = [
+        f"CREATE OR REPLACE MATERIALIZED VIEW `{PROJECT_ID}.nwsl_fbref.{name}` AS {view_select(name, PROJECT_ID)}"
+        for name in MATERIALIZED_VIEWS
+    ]
+    
+    try:
+        for sql in view_sqls:
+            client.query(sql).result()
+        print(f"✅ Created materialized views: {', '.join(f'nwsl_fbref.{name}' for name in MATERIALIZED_VIEWS)}")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to create materialized views: {e}")
+        return False
+
 def main():
     """Main processing function"""
     print("🚀 Processing All NWSL Player Statistics Files")
@@ -131,33 +166,49 @@ def main():
     uploaded_count = 0
     all_data = []
     
-    # Process each file
+    # Pair each file with its year
+    year_files = []
     for file_path in sorted(excel_files):
         year = extract_year_from_filename(file_path.name)
         if not year:
             print(f"⚠️ Could not extract year from {file_path.name}, skipping")
             continue
-        
-        # Process file
-        df = process_excel_file(file_path, year)
+        year_files.append((file_path, year))
+    
+    # Excel parsing is CPU-bound: parse files in parallel processes
+    with ProcessPoolExecutor() as executor:
+        frames = list(executor.map(
+            process_excel_file,
+            [file_path for file_path, _ in year_files],
+            [year for _, year in year_files]
+        ))
+    
+    processed = []
+    for (file_path, year), df in zip(year_files, frames):
         if df is not None:
             processed_count += 1
             all_data.append(df)
             
-            # Upload to BigQuery
-            if upload_to_bigquery(df, year):
-                uploaded_count += 1
-            
-            # Save processed CSV
-            output_path = f"data/processed/player_stats_{year}.csv"
-            df.to_csv(output_path, index=False)
+            # Save processed Parquet, which is also the upload source
+            output_path = f"data/processed/player_stats_{year}.parquet"
+            df.to_parquet(output_path, index=False, compression='zstd')
             print(f"💾 Saved to: {output_path}")
-        
-        print()  # Empty line for readability
+            processed.append((output_path, year, len(df)))
+    
+    # The first load creates the partitioned table; the remaining years are
+    # network-bound, so run them on threads sharing one client
+    if processed:
+        uploaded_count += upload_to_bigquery(*processed[0])
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            uploaded = list(executor.map(lambda item: upload_to_bigquery(*item), processed[1:]))
+        uploaded_count += sum(uploaded)
+    
+    print()  # Empty line for readability
     
     # Create unified view
     if uploaded_count > 0:
         create_unified_view()
+        create_materialized_views()
     
     # Summary statistics
     print("📊 PROCESSING SUMMARY")
@@ -181,8 +232,9 @@ def main():
     print(f"\n🎉 Processing complete!")
     if uploaded_count > 0:
         print("📊 Data available in BigQuery:")
-        print("   - Individual year tables: nwsl_fbref.player_stats_YYYY")
+        print("   - Season-partitioned table: nwsl_fbref.player_stats")
         print("   - Unified view: nwsl_fbref.player_stats_all_years")
+        print("   - Materialized views: nwsl_fbref.team_season_stats, nwsl_fbref.season_correlation_sums")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -12,6 +12,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from nwsl_analytics.config.settings import settings
 from nwsl_analytics.data.ingestion.fbref_client import FBrefAPIClient
+from nwsl_analytics.utils.http import install_http_cache
 
 # Setup logging
 logging.basicConfig(
@@ -23,6 +24,7 @@ logger = logging.getLogger(__name__)
 def main():
     """Test FBref API client"""
     logger.info("🧪 Testing FBref API client...")
+    install_http_cache()
     
     # Create client without API key first (to test endpoints)
     client = FBrefAPIClient(
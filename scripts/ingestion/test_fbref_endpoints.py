@@ -4,19 +4,30 @@ Test all FBref endpoints to see what works
 """
 
 import os
+import sys
 import requests
 import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+
+# Add src to path so we can import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from nwsl_analytics.utils.http import install_http_cache
+
+API_KEY = os.getenv('FBREF_API_KEY', 'KvcVSKb_a49kmsKc6nnFAPfyaLPwLqiKm4VBxA2fvmY')
+BASE_URL = "https://fbrapi.com"
+HEADERS = {
+    "X-API-Key": API_KEY,
+    "Content-Type": "application/json",
+    "User-Agent": "NWSL-Analytics/1.0"
+}
 
 def test_endpoints():
-    api_key = os.getenv('FBREF_API_KEY', 'KvcVSKb_a49kmsKc6nnFAPfyaLPwLqiKm4VBxA2fvmY')
     nwsl_league_id = "182"
     
-    headers = {
-        "X-API-Key": api_key,
-        "Content-Type": "application/json",
-        "User-Agent": "NWSL-Analytics/1.0"
-    }
-    
     endpoints_to_test = [
         ("team-season-stats", "2024"),
         ("team-season-stats", "2025"),
@@ -28,20 +39,40 @@ def test_endpoints():
         ("all-players-match-stats", "2025"),
     ]
     
-    for endpoint, season in endpoints_to_test:
-        print(f"\n🔍 Testing {endpoint} for {season}...")
-        
-        url = f"https://fbrapi.com/{endpoint}"
+    # Reruns hit the same URLs; serve them from the on-disk cache
+    install_http_cache()
+    
+    # One keep-alive session so the TLS handshake is paid once, not per endpoint
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=len(endpoints_to_test)))
+    
+    def probe(endpoint_season):
+        endpoint, season = endpoint_season
+        url = f"{BASE_URL}/{endpoint}"
         params = {
             "league_id": nwsl_league_id,
             "season_id": season
         }
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            return session.get(url, params=params), None
+        except Exception as e:
+            return None, e
+    
+    # Probes are independent, so issue them all at once and report in order
+    with ThreadPoolExecutor(max_workers=len(endpoints_to_test)) as executor:
+        outcomes = list(executor.map(probe, endpoints_to_test))
+    
+    for (endpoint, season), (response, error) in zip(endpoints_to_test, outcomes):
+        print(f"\n🔍 Testing {endpoint} for {season}...")
+        
+        try:
+            if error is not None:
+                raise error
             
             if response.status_code == 200:
-                data = response.json().get("data", [])
+                data = orjson.loads(response.content).get("data", [])
                 print(f"   ✅ Success: {len(data)} records")
                 
                 if data and endpoint == "team-season-stats":
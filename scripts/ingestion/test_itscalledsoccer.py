@@ -5,14 +5,21 @@ This is the proper way to access American Soccer Analysis data
 """
 
 import sys
+import re
+import argparse
+import importlib.util
 import logging
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from pathlib import Path
 
-# Import itscalledsoccer
-try:
-    from itscalledsoccer.client import AmericanSoccerAnalysis
-except ImportError:
+# Add src to path so we can import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from nwsl_analytics.utils.http import install_http_cache
+
+# Check for itscalledsoccer without importing it; the client is imported where used
+if importlib.util.find_spec("itscalledsoccer") is None:
     print("❌ itscalledsoccer not installed. Run: pip install itscalledsoccer")
     sys.exit(1)
 
@@ -20,11 +27,84 @@ except ImportError:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def test_asa_player_data():
+def probe(asa, data_type: str, method_name: str):
+    """Call one ASA endpoint for NWSL, returning (data_type, result dict)"""
+    logger.info(f"\n📊 Testing {data_type}...")
+    
+    try:
+        method = getattr(asa, method_name)
+        
+        # Try with NWSL league and recent seasons
+        logger.info(f"   🔍 Calling {method_name} for NWSL...")
+        
+        if data_type in ['games', 'team_stats', 'player_stats', 'player_goals_added', 'goalkeeper_stats']:
+            # These methods support season filtering
+            df = method(leagues=['nwsl'], seasons=[2024, 2023])
+        else:
+            # These methods get all data
+            df = method(leagues=['nwsl'])
+        
+        if df is not None and len(df) > 0:
+            logger.info(f"   ✅ {data_type}: {len(df)} records")
+            result = {
+                'records': len(df),
+                'columns': list(df.columns),
+                'sample_data': df.head(10)
+            }
+            
+            # Show key columns
+            logger.info(f"   📊 Columns ({len(df.columns)}): {list(df.columns)[:8]}...")
+            
+            # Check for desired player stats fields
+            if 'player' in data_type:
+                desired_fields = [
+                    'player_name', 'team', 'position', 'games_played', 'games_started',
+                    'minutes_played', 'goals', 'assists', 'accurate_pass_percentage',
+                    'total_scoring_attempts', 'on_target_scoring_attempts', 'tackles',
+                    'yellow_cards', 'red_cards', 'fouls_committed', 'fouls_suffered'
+                ]
+                
+                # Exact or partial matches: each field and its '_' parts as one alternation
+                cols_lower = df.columns.str.lower()
+                found_fields = []
+                for field in desired_fields:
+                    names = [field.lower(), *field.lower().split('_')]
+                    pattern = '|'.join(map(re.escape, names))
+                    found_fields.extend(df.columns[cols_lower.str.contains(pattern, regex=True)])
+                
+                if found_fields:
+                    logger.info(f"   🎯 Relevant fields: {found_fields[:8]}...")
+            
+            # Show sample row
+            if not df.empty:
+                sample = df.iloc[0]
+                if 'player_name' in df.columns:
+                    player_name = sample.get('player_name', 'Unknown')
+                    team = sample.get('team_name', sample.get('team', 'Unknown'))
+                    logger.info(f"   👤 Sample: {player_name} ({team})")
+                elif 'team_name' in df.columns:
+                    team_name = sample.get('team_name', 'Unknown')
+                    logger.info(f"   🏆 Sample: {team_name}")
+            
+            return data_type, result
+                
+        else:
+            logger.info(f"   ❌ {data_type}: No data returned")
+            return data_type, {'records': 0}
+            
+    except Exception as e:
+        logger.info(f"   💥 {data_type} failed: {str(e)[:100]}...")
+        return data_type, {'error': str(e)}
+
+def test_asa_player_data(dump_samples: bool = False):
     """Test American Soccer Analysis API for NWSL player data"""
     logger.info("🔍 Testing itscalledsoccer library for NWSL data...")
     
+    # itscalledsoccer uses requests, so reruns are served from the on-disk cache
+    install_http_cache(expire_after=timedelta(hours=6))
+    
     # Create ASA client
+    from itscalledsoccer.client import AmericanSoccerAnalysis
     asa = AmericanSoccerAnalysis()
     
     # Test different data types
@@ -40,90 +120,31 @@ def test_asa_player_data():
         ('team_salaries', 'get_team_salaries')
     ]
     
-    results = {}
+    # Each probe is one HTTP round-trip, so run them all at once;
+    # map() still yields results in the declared order
+    with ThreadPoolExecutor(max_workers=len(data_tests)) as executor:
+        results = dict(executor.map(lambda test: probe(asa, *test), data_tests))
     
-    for data_type, method_name in data_tests:
-        logger.info(f"\n📊 Testing {data_type}...")
-        
-        try:
-            method = getattr(asa, method_name)
-            
-            # Try with NWSL league and recent seasons
-            logger.info(f"   🔍 Calling {method_name} for NWSL...")
-            
-            if data_type in ['games', 'team_stats', 'player_stats', 'player_goals_added', 'goalkeeper_stats']:
-                # These methods support season filtering
-                df = method(leagues=['nwsl'], seasons=[2024, 2023])
-            else:
-                # These methods get all data
-                df = method(leagues=['nwsl'])
-            
-            if df is not None and len(df) > 0:
-                logger.info(f"   ✅ {data_type}: {len(df)} records")
-                results[data_type] = {
-                    'records': len(df),
-                    'columns': list(df.columns),
-                    'sample_data': df.head(3)
-                }
-                
-                # Show key columns
-                logger.info(f"   📊 Columns ({len(df.columns)}): {list(df.columns)[:8]}...")
-                
-                # Check for desired player stats fields
-                if 'player' in data_type:
-                    desired_fields = [
-                        'player_name', 'team', 'position', 'games_played', 'games_started',
-                        'minutes_played', 'goals', 'assists', 'accurate_pass_percentage',
-                        'total_scoring_attempts', 'on_target_scoring_attempts', 'tackles',
-                        'yellow_cards', 'red_cards', 'fouls_committed', 'fouls_suffered'
-                    ]
-                    
-                    found_fields = []
-                    for field in desired_fields:
-                        # Check exact match or similar fields
-                        matching_cols = [col for col in df.columns if field.lower() in col.lower() or any(part in col.lower() for part in field.lower().split('_'))]
-                        if matching_cols:
-                            found_fields.extend(matching_cols)
-                    
-                    if found_fields:
-                        logger.info(f"   🎯 Relevant fields: {found_fields[:8]}...")
-                
-                # Save sample data
+    # Write every sample in one batch, only when asked for
+    if dump_samples:
+        for data_type, result in results.items():
+            if 'sample_data' in result:
                 filename = f"asa_{data_type}_sample.csv"
-                df.head(10).to_csv(filename, index=False)
-                logger.info(f"   💾 Saved sample to {filename}")
-                
-                # Show sample row
-                if not df.empty:
-                    sample = df.iloc[0]
-                    if 'player_name' in df.columns:
-                        player_name = sample.get('player_name', 'Unknown')
-                        team = sample.get('team_name', sample.get('team', 'Unknown'))
-                        logger.info(f"   👤 Sample: {player_name} ({team})")
-                    elif 'team_name' in df.columns:
-                        team_name = sample.get('team_name', 'Unknown')
-                        logger.info(f"   🏆 Sample: {team_name}")
-                    
-            else:
-                logger.info(f"   ❌ {data_type}: No data returned")
-                results[data_type] = {'records': 0}
-                
-        except Exception as e:
-            logger.info(f"   💥 {data_type} failed: {str(e)[:100]}...")
-            results[data_type] = {'error': str(e)}
+                result['sample_data'].to_csv(filename, index=False)
+                logger.info(f"💾 Saved sample to {filename}")
     
     # Summary
-    logger.info(f"\n{'='*60}")
-    logger.info("📊 SUMMARY - NWSL Data Available via itscalledsoccer")
-    logger.info(f"{'='*60}")
+    summary_lines = [f"\n{'='*60}", "📊 SUMMARY - NWSL Data Available via itscalledsoccer", f"{'='*60}"]
     
     successful_types = []
     for data_type, result in results.items():
         if isinstance(result, dict) and result.get('records', 0) > 0:
             successful_types.append(data_type)
-            logger.info(f"✅ {data_type}: {result['records']} records")
+            summary_lines.append(f"✅ {data_type}: {result['records']} records")
         else:
-            logger.info(f"❌ {data_type}: Not available")
+            summary_lines.append(f"❌ {data_type}: Not available")
+    
+    logger.info("\n".join(summary_lines))
     
     if successful_types:
         logger.info(f"\n🎉 SUCCESS! Available data types: {successful_types}")
@@ -147,6 +168,7 @@ def show_detailed_player_stats():
     logger.info("🔍 DETAILED PLAYER STATISTICS ANALYSIS")
     logger.info(f"{'='*60}")
     
+    from itscalledsoccer.client import AmericanSoccerAnalysis
     asa = AmericanSoccerAnalysis()
     
     try:
@@ -158,12 +180,12 @@ def show_detailed_player_stats():
             logger.info(f"✅ Found {len(player_stats)} player stat records")
             
             # Show all columns
-            logger.info(f"\n📋 ALL AVAILABLE COLUMNS ({len(player_stats.columns)}):")
-            for i, col in enumerate(player_stats.columns, 1):
-                logger.info(f"   {i:2d}. {col}")
+            # One log record per listing rather than one per line
+            logger.info(f"\n📋 ALL AVAILABLE COLUMNS ({len(player_stats.columns)}):\n" + "\n".join(
+                f"   {i:2d}. {col}" for i, col in enumerate(player_stats.columns, 1)
+            ))
             
             # Map to desired fields
-            logger.info(f"\n🎯 MAPPING TO DESIRED FIELDS:")
             desired_mapping = {
                 'team': ['team_name', 'team'],
                 'player_name': ['player_name', 'name'],
@@ -183,19 +205,26 @@ def show_detailed_player_stats():
                 'fouls_suffered': ['fouls_suffered', 'fouls_drawn']
             }
             
+            # Lower-case the columns once and match each field with one vectorized regex
+            cols_lower = player_stats.columns.str.lower()
             available_fields = {}
+            mapping_lines = []
             for desired_field, possible_names in desired_mapping.items():
-                found = [col for col in player_stats.columns if any(name.lower() in col.lower() for name in possible_names)]
+                pattern = '|'.join(re.escape(name.lower()) for name in possible_names)
+                found = player_stats.columns[cols_lower.str.contains(pattern, regex=True)].tolist()
                 if found:
                     available_fields[desired_field] = found[0]  # Take first match
-                    logger.info(f"   ✅ {desired_field}: {found[0]}")
+                    mapping_lines.append(f"   ✅ {desired_field}: {found[0]}")
                 else:
-                    logger.info(f"   ❌ {desired_field}: Not found")
+                    mapping_lines.append(f"   ❌ {desired_field}: Not found")
+            
+            logger.info("\n🎯 MAPPING TO DESIRED FIELDS:\n" + "\n".join(mapping_lines))
             
             logger.info(f"\n📊 AVAILABLE: {len(available_fields)}/{len(desired_mapping)} desired fields")
             
             # Show sample data with available fields
-            if available_fields:
+            # Formatting the table is only worth it for someone watching a terminal
+            if available_fields and sys.stdout.isatty():
                 logger.info(f"\n👤 SAMPLE PLAYER DATA:")
                 sample_cols = list(available_fields.values())[:8]  # First 8 available fields
                 sample_data = player_stats[sample_cols].head(3)
@@ -205,8 +234,13 @@ def show_detailed_player_stats():
         logger.error(f"❌ Error getting detailed player stats: {e}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Probe itscalledsoccer for NWSL data")
+    parser.add_argument('--dump-samples', action='store_true',
+                        help="Write the first rows of each data type to asa_<type>_sample.csv")
+    args = parser.parse_args()
+    
     # Test all data types
-    results = test_asa_player_data()
+    results = test_asa_player_data(dump_samples=args.dump_samples)
     
     # Show detailed player stats if available
     if any('player' in dt for dt in results.keys() if results[dt].get('records', 0) > 0):
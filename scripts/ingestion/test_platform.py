@@ -4,9 +4,11 @@ Test NWSL Data Platform
 """
 
 import sys
+import functools
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
+import pandas as pd
 from google.cloud import bigquery
 from nwsl_analytics.config.settings import settings
 
@@ -16,9 +18,13 @@ print(f"💾 Dataset: {settings.bigquery_dataset_id}")
 
 client = bigquery.Client(project=settings.gcp_project_id)
 
+@functools.lru_cache(maxsize=1)
+def get_tables(project_id, dataset_id):
+    """List a dataset's tables once, in a single page"""
+    return list(client.list_tables(f"{project_id}.{dataset_id}", page_size=1000))
+
 # Test 1: Team Stats with xG
-print("\n1️⃣ Top teams by xG in 2024:")
-query = """
+team_xg_query = """
 SELECT 
   meta_data.team_name,
   stats.stats.ttl_gls as goals,
@@ -29,12 +35,9 @@ FROM `nwsl-data.nwsl_fbref.nwsl_team_season_stats_2024`
 ORDER BY stats.stats.ttl_xg DESC 
 LIMIT 5
 """
-results = client.query(query).to_dataframe()
-print(results.to_string(index=False))
 
 # Test 2: Match Data
-print("\n2️⃣ Recent matches:")
-query = """
+matches_query = """
 SELECT 
   date,
   home,
@@ -46,13 +49,24 @@ WHERE date >= '2024-10-01'
 ORDER BY date DESC
 LIMIT 5
 """
-results = client.query(query).to_dataframe()
+
+# query() returns as soon as the job is submitted, so both run in BigQuery
+# at the same time; results are only awaited below
+team_xg_job = client.query(team_xg_query)
+matches_job = client.query(matches_query)
+
+print("\n1️⃣ Top teams by xG in 2024:")
+# Results stream as Arrow (via the Storage API when installed) into Arrow-backed columns
+results = team_xg_job.to_arrow(create_bqstorage_client=True).to_pandas(types_mapper=pd.ArrowDtype)
+print(results.to_string(index=False))
+
+print("\n2️⃣ Recent matches:")
+results = matches_job.to_arrow(create_bqstorage_client=True).to_pandas(types_mapper=pd.ArrowDtype)
 print(results.to_string(index=False))
 
 # Test 3: Check available tables
 print("\n3️⃣ Available tables:")
-tables = client.list_tables(f"{settings.gcp_project_id}.{settings.bigquery_dataset_id}")
-for table in tables:
+for table in get_tables(settings.gcp_project_id, settings.bigquery_dataset_id):
     print(f"  - {table.table_id}")
 
 print("\n✅ Platform test complete!")
\ No newline at end of file
@@ -4,9 +4,12 @@ Test NWSL Data Availability with soccerdata
 Test script to check if soccerdata can access NWSL player statistics
 """
 
+import argparse
+import functools
 import sys
 import logging
 from pathlib import Path
+from typing import Optional
 import pandas as pd
 
 # Import soccerdata
@@ -20,7 +23,83 @@ except ImportError:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def test_nwsl_data_sources():
+def count(df: pd.DataFrame) -> int:
+    """Row count in a single lookup (0 for an empty frame)"""
+    return df.shape[0]
+
+@functools.lru_cache(maxsize=32)
+def _make_scraper(source_class, league_code: str, season: str):
+    """Build each (source, league code, season) scraper only once"""
+    return source_class(league_code, season)
+
+@functools.lru_cache(maxsize=None)
+def _supported_leagues(source_class) -> Optional[frozenset]:
+    """League codes a source knows about, or None if it can't say"""
+    try:
+        return frozenset(source_class.available_leagues())
+    except Exception:
+        return None
+
+def _read_schedule(scraper) -> int:
+    """Number of scheduled matches, or 0 when the schedule can't be read"""
+    try:
+        schedule = scraper.read_schedule()
+    except Exception as e:
+        logger.info(f"      ❌ Schedule failed: {str(e)[:50]}...")
+        return 0
+    
+    matches_count = count(schedule)
+    logger.info(f"      📅 Schedule: {matches_count} matches")
+    return matches_count
+
+def _probe_team_stats(scraper) -> dict:
+    """Number of teams with season stats"""
+    try:
+        team_stats = scraper.read_team_season_stats()
+    except Exception as e:
+        logger.info(f"      ❌ Team stats failed: {str(e)[:50]}...")
+        return {}
+    
+    team_count = count(team_stats)
+    logger.info(f"      🏆 Team stats: {team_count} teams")
+    return {'teams': team_count}
+
+def _log_player_sample(player_stats: pd.DataFrame, source_name: str, save_samples: bool):
+    """Show the first player, optionally saving a small sample"""
+    sample = player_stats.iloc[0]
+    player_name = sample.get('player', sample.get('name', 'Unknown'))
+    team = sample.get('team', 'Unknown')
+    logger.info(f"         Sample: {player_name} ({team})")
+    logger.info(f"         Columns: {list(player_stats.columns)[:8]}...")
+    
+    # Debug artifact, so only written on request
+    if save_samples:
+        filename = f"sample_{source_name.lower()}_players.parquet"
+        player_stats.head(5).to_parquet(filename)
+        logger.info(f"         💾 Saved sample to {filename}")
+
+def _probe_player_stats(scraper, source_name: str, save_samples: bool) -> dict:
+    """Record counts per player stat type; 'standard' is the default view"""
+    stats_by_type = {}
+    for stat_type in ['standard', 'shooting', 'passing', 'defense']:
+        try:
+            player_stats = scraper.read_player_season_stats(stat_type=stat_type)
+        except Exception as e:
+            logger.info(f"      ⚠️ {stat_type} failed: {str(e)[:30]}...")
+            continue
+        
+        records = count(player_stats)
+        if not records:
+            continue
+        
+        logger.info(f"      🎯 {stat_type} stats: {records} records")
+        stats_by_type[f'{stat_type}_stats'] = records
+        if stat_type == 'standard':
+            _log_player_sample(player_stats, source_name, save_samples)
+    
+    return stats_by_type
+
+def test_nwsl_data_sources(save_samples: bool = False):
     """Test different data sources for NWSL availability"""
     
     # Possible NWSL league identifiers
@@ -40,84 +119,43 @@ def test_nwsl_data_sources():
     }
     
     season = '2024'
-    results = {}
+    results = {source_name: {} for source_name in sources}
     
     logger.info("🔍 Testing NWSL data availability...")
     logger.info(f"📅 Testing season: {season}")
     
     for source_name, source_class in sources.items():
         logger.info(f"\n📊 Testing {source_name}...")
-        results[source_name] = {}
         
         for league_code in nwsl_codes:
             logger.info(f"   🔍 Trying league code: '{league_code}'")
             
+            # Skip codes the source doesn't list instead of constructing a scraper
+            supported = _supported_leagues(source_class)
+            if supported is not None and league_code not in supported:
+                logger.info(f"      ⏭️ Not in {source_name}'s available leagues")
+                continue
+            
             try:
                 # Create scraper instance
-                scraper = source_class(league_code, season)
-                
-                # Test 1: Read schedule
-                try:
-                    schedule = scraper.read_schedule()
-                    matches_count = len(schedule) if not schedule.empty else 0
-                    logger.info(f"      📅 Schedule: {matches_count} matches")
-                    
-                    if matches_count > 0:
-                        results[source_name][league_code] = {'schedule': matches_count}
-                        
-                        # Test 2: Team stats
-                        try:
-                            team_stats = scraper.read_team_season_stats()
-                            team_count = len(team_stats) if not team_stats.empty else 0
-                            logger.info(f"      🏆 Team stats: {team_count} teams")
-                            results[source_name][league_code]['teams'] = team_count
-                            
-                        except Exception as e:
-                            logger.info(f"      ❌ Team stats failed: {str(e)[:50]}...")
-                        
-                        # Test 3: Player stats (general)
-                        try:
-                            player_stats = scraper.read_player_season_stats()
-                            player_count = len(player_stats) if not player_stats.empty else 0
-                            logger.info(f"      👥 Player stats: {player_count} players")
-                            results[source_name][league_code]['players'] = player_count
-                            
-                            if player_count > 0:
-                                # Show sample player data
-                                sample = player_stats.iloc[0]
-                                player_name = sample.get('player', sample.get('name', 'Unknown'))
-                                team = sample.get('team', 'Unknown')
-                                logger.info(f"         Sample: {player_name} ({team})")
-                                logger.info(f"         Columns: {list(player_stats.columns)[:8]}...")
-                                
-                                # Save sample to file
-                                filename = f"sample_{source_name.lower()}_{league_code.replace('-', '_')}_players.csv"
-                                player_stats.head(5).to_csv(filename, index=False)
-                                logger.info(f"         💾 Saved sample to {filename}")
-                                
-                        except Exception as e:
-                            logger.info(f"      ❌ Player stats failed: {str(e)[:50]}...")
-                        
-                        # Test 4: Different stat types
-                        stat_types = ['standard', 'shooting', 'passing', 'defense']
-                        for stat_type in stat_types:
-                            try:
-                                stats = scraper.read_player_season_stats(stat_type=stat_type)
-                                count = len(stats) if not stats.empty else 0
-                                if count > 0:
-                                    logger.info(f"      🎯 {stat_type} stats: {count} records")
-                                    results[source_name][league_code][f'{stat_type}_stats'] = count
-                            except Exception as e:
-                                logger.info(f"      ⚠️ {stat_type} failed: {str(e)[:30]}...")
-                        
-                        # If we found working data, break to next source
-                        break
-                        
-                except Exception as e:
-                    logger.info(f"      ❌ Schedule failed: {str(e)[:50]}...")
-                    
+                scraper = _make_scraper(source_class, league_code, season)
             except Exception as e:
                 logger.info(f"   💥 {source_name}({league_code}) initialization failed: {str(e)[:50]}...")
+                continue
+            
+            # Codes without a schedule go straight to the next candidate
+            matches_count = _read_schedule(scraper)
+            if not matches_count:
+                continue
+            
+            results[source_name][league_code] = {
+                'schedule': matches_count,
+                **_probe_team_stats(scraper),
+                **_probe_player_stats(scraper, source_name, save_samples),
+            }
+            
+            # If we found working data, break to next source
+            break
     
     # Summary
     logger.info(f"\n{'='*60}")
@@ -149,12 +187,12 @@ def test_specific_source():
     # Try FBref with standard soccer league format
     try:
         logger.info("Testing FBref with 'United States' format...")
-        fbref = sd.FBref('United States', '2024')
+        fbref = _make_scraper(sd.FBref, 'United States', '2024')
         
         # List available leagues/competitions
         logger.info("Attempting to read schedule...")
         schedule = fbref.read_schedule()
-        logger.info(f"Schedule result: {len(schedule) if not schedule.empty else 0} matches")
+        logger.info(f"Schedule result: {count(schedule)} matches")
         
     except Exception as e:
         logger.info(f"FBref test failed: {e}")
@@ -162,16 +200,21 @@ def test_specific_source():
     # Try ESPN
     try:
         logger.info("\nTesting ESPN with 'NWSL' format...")
-        espn = sd.ESPN('NWSL', '2024')
+        espn = _make_scraper(sd.ESPN, 'NWSL', '2024')
         schedule = espn.read_schedule()
-        logger.info(f"ESPN schedule: {len(schedule) if not schedule.empty else 0} matches")
+        logger.info(f"ESPN schedule: {count(schedule)} matches")
         
     except Exception as e:
         logger.info(f"ESPN test failed: {e}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Probe soccerdata sources for NWSL data")
+    parser.add_argument('--save-samples', action='store_true',
+                        help="Write the first player rows of each working source to Parquet")
+    args = parser.parse_args()
+    
     # Test all sources systematically
-    results = test_nwsl_data_sources()
+    results = test_nwsl_data_sources(save_samples=args.save_samples)
     
     # Test specific configurations
     test_specific_source()
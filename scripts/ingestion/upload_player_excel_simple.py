@@ -3,21 +3,23 @@
 Simple Excel to BigQuery upload for NWSL player statistics
 """
 
+from pathlib import Path
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from google.cloud import bigquery
 
 def upload_excel_to_bigquery():
-    """Upload Excel player data directly to BigQuery using pandas-gbq"""
+    """Upload Excel player data to BigQuery as a Parquet load job"""
     print("🚀 Starting simple Excel to BigQuery upload")
     print("=" * 50)
     
-    # Read Excel file
+    # Read Excel file (Rust-based calamine parser)
     excel_path = "data/raw/excel/Player Standard Stats 2025 NWSL_rev.xlsx"
     print(f"📊 Reading Excel file: {excel_path}")
     
     try:
-        df = pd.read_excel(excel_path)
+        df = pd.read_excel(excel_path, engine='calamine', sheet_name=0)
         print(f"✅ Loaded {len(df)} rows and {len(df.columns)} columns")
         
         # Clean column names for BigQuery
@@ -35,33 +37,44 @@ def upload_excel_to_bigquery():
             'Born': 0
         })
         
-        # Convert numeric columns
+        # Numeric columns are numeric already; only their gaps need filling
         numeric_cols = df.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        df[numeric_cols] = df[numeric_cols].fillna(0)
         
         print(f"✅ Data prepared: {len(df)} rows, {len(df.columns)} columns")
         
-        # Upload to BigQuery using pandas-gbq
+        # Upload to BigQuery as one columnar, compressed Parquet load
         project_id = "nwsl-data"
-        table_id = "nwsl_fbref.player_stats_2025"
+        table_id = "nwsl_fbref.player_stats"
         
-        print(f"📤 Uploading to BigQuery: {table_id}")
+        print(f"📤 Uploading to BigQuery: {table_id} (partition 2025)")
         
-        df.to_gbq(
-            destination_table=table_id,
-            project_id=project_id,
-            if_exists='replace',
-            chunksize=1000,
-            progress_bar=True
+        # The processed copy doubles as the load file: typed, small and fast to write
+        parquet_path = Path("data/processed/player_stats_2025.parquet")
+        parquet_path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", compression_level=3, index=False)
+        
+        client = bigquery.Client(project=project_id)
+        # Same season-partitioned table process_all_player_data.py loads; the
+        # partition decorator limits WRITE_TRUNCATE to 2025
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition="WRITE_TRUNCATE",
+            range_partitioning=bigquery.RangePartitioning(
+                field="season",
+                range_=bigquery.PartitionRange(start=2000, end=2100, interval=1)
+            ),
+            schema_update_options=[
+                bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION,
+                bigquery.SchemaUpdateOption.ALLOW_FIELD_RELAXATION
+            ]
         )
+        with open(parquet_path, 'rb') as f:
+            job = client.load_table_from_file(f, f"{project_id}.{table_id}$2025", job_config=job_config)
+        job.result()
         
         print(f"✅ Successfully uploaded {len(df)} rows to {table_id}")
-        
-        # Save processed data locally too
-        output_path = "data/processed/player_stats_2025.csv"
-        df.to_csv(output_path, index=False)
-        print(f"💾 Also saved to: {output_path}")
+        print(f"💾 Also saved to: {parquet_path}")
         
         return True
         
@@ -1,10 +1,12 @@
 """Configuration management for NWSL Analytics."""
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Annotated, List, Optional
 
-from pydantic_settings import BaseSettings
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode
 
 
 class Settings(BaseSettings):
@@ -16,7 +18,10 @@ class Settings(BaseSettings):
     google_application_credentials: Optional[str] = None
     
     # Data Configuration
-    nwsl_seasons: str = "2016,2017,2018,2019,2020,2021,2022,2023,2024,2025"
+    # NoDecode: the env value is comma-separated, not a JSON list
+    nwsl_seasons: Annotated[List[str], NoDecode] = [
+        "2016", "2017", "2018", "2019", "2020", "2021", "2022", "2023", "2024", "2025"
+    ]
     cache_dir: str = "/tmp/nwsl_cache"
     min_minutes_threshold: int = 450
     
@@ -32,10 +37,13 @@ class Settings(BaseSettings):
     debug: bool = False
     environment: str = "development"
     
-    @property
-    def seasons_list(self) -> List[str]:
+    @field_validator("nwsl_seasons", mode="before")
+    @classmethod
+    def split_seasons(cls, value):
         """Convert comma-separated seasons to list"""
-        return [s.strip() for s in self.nwsl_seasons.split(",")]
+        if isinstance(value, str):
+            return [s.strip() for s in value.split(",") if s.strip()]
+        return value
     
     class Config:
         env_file = ".env"
@@ -43,5 +51,11 @@ class Settings(BaseSettings):
         extra = "ignore"  # Ignore extra fields like FBREF_API_KEY
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the settings once; call get_settings.cache_clear() to reload"""
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
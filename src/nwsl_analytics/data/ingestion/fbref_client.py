@@ -3,15 +3,122 @@ FBref API Client for NWSL analytics
 Professional soccer statistics from FBRef.com via FBR API
 """
 
+import io
 import logging
+import os
+import random
+import tempfile
+import threading
 import time
-from typing import List, Optional, Dict, Any
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+import orjson
 import requests
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from google.api_core.exceptions import NotFound
 from google.cloud import bigquery
 
+from ...config.settings import settings
+from ...utils.dataframe import sanitize_columns
+
 logger = logging.getLogger(__name__)
 
+# Responses worth retrying: throttling and server-side failures
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Known numeric fields per endpoint; nullable Int32 keeps counts integral when
+# a player is missing a value
+PLAYER_SEASON_DTYPES = {
+    "games_played": "Int32",
+    "games_started": "Int32",
+    "minutes_played": "Int32",
+    "goals": "Int32",
+    "assists": "Int32",
+    "penalty_kick_goals": "Int32",
+    "total_scoring_attempts": "Int32",
+    "on_target_scoring_attempts": "Int32",
+    "tackles": "Int32",
+    "interceptions": "Int32",
+    "crosses": "Int32",
+    "long_balls": "Int32",
+    "turnovers": "Int32",
+    "successful_dribble": "Int32",
+    "fouls_committed": "Int32",
+    "fouls_suffered": "Int32",
+    "yellow_cards": "Int32",
+    "red_cards": "Int32",
+    "accurate_pass_percentage": "float64",
+    "xg": "float64",
+    "xa": "float64",
+}
+MATCH_DTYPES = {
+    "home_score": "Int32",
+    "away_score": "Int32",
+    "home_xg": "float64",
+    "away_xg": "float64",
+}
+
+FBREF_ENDPOINTS = (
+    "countries", "leagues", "league-seasons",
+    "team-season-stats", "player-season-stats", "matches", "all-players-match-stats",
+)
+
+
+@lru_cache(maxsize=512)
+def _build_season_url(endpoint_url: str, league_id: str, season_id: str) -> str:
+    """Build (once) the query URL for one league season of an endpoint"""
+    return f"{endpoint_url}?{urlencode({'league_id': league_id, 'season_id': season_id})}"
+
+# How long each endpoint's cached responses stay fresh
+FBREF_CACHE_TTLS = {
+    "*/countries": requests_cache.NEVER_EXPIRE,
+    "*/leagues": timedelta(days=30),
+    "*/league-seasons": timedelta(days=1),
+    "*/team-season-stats": timedelta(hours=6),
+    "*/player-season-stats": timedelta(hours=6),
+    "*/matches": timedelta(hours=6),
+    "*/all-players-match-stats": timedelta(hours=6),
+}
+
+FBREF_RATE_LIMIT_SECONDS = 6  # FBref requires 6 seconds between requests
+
+
+class TokenBucket:
+    """Hands out one request slot every rate_s seconds across all threads"""
+    
+    def __init__(self, rate_s: float):
+        self.rate_s = rate_s
+        self._lock = threading.Lock()
+        self._next = 0.0  # time.monotonic() at which the next slot opens
+    
+    def acquire(self):
+        """Block until the next slot opens, then claim it"""
+        # Waiters queue on the lock, so each is released the moment its slot opens
+        with self._lock:
+            wait_time = self._next - time.monotonic()
+            if wait_time > 0:
+                logger.info(f"⏳ Rate limit: waiting {wait_time:.1f} seconds...")
+                time.sleep(wait_time)
+            self._next = time.monotonic() + self.rate_s
+    
+    def defer(self, seconds: float):
+        """Push the next slot at least `seconds` into the future"""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+# The limit is per API key, so every client and thread shares one bucket
+_FBREF_BUCKET = TokenBucket(FBREF_RATE_LIMIT_SECONDS)
+
 class FBrefAPIClient:
     """Client for fetching NWSL data from FBRef via FBR API"""
     
@@ -20,49 +127,216 @@ class FBrefAPIClient:
         self.dataset_id = dataset_id
         self.api_key = api_key
         self.base_url = "https://fbrapi.com"
+        self._urls = {endpoint: f"{self.base_url}/{endpoint}" for endpoint in FBREF_ENDPOINTS}
         self.client = bigquery.Client(project=project_id)
-        self.last_request_time = 0
-        self.rate_limit_seconds = 6  # FBref requires 6 seconds between requests
+        self._bucket = _FBREF_BUCKET
         
-        # Headers for API requests
+        # Headers for API requests, set once on the session rather than per call
         self.headers = {
-            "X-API-Key": api_key if api_key else None,
             "Content-Type": "application/json",
             "User-Agent": "NWSL-Analytics/1.0"
         }
+        if api_key:
+            self.headers["X-API-Key"] = api_key
+        
+        # One keep-alive session so each endpoint call skips the TLS handshake.
+        # Responses are cached on disk: IDs and finished seasons rarely change,
+        # so re-runs skip both the network and most of the rate-limit waits.
+        # Expired entries that carry an ETag/Last-Modified are revalidated with
+        # a conditional GET, and a 304 reuses the stored body
+        self.session = requests_cache.CachedSession(
+            cache_name=str(Path(settings.cache_dir) / "fbref_http"),
+            backend="sqlite",
+            expire_after=timedelta(days=7),
+            urls_expire_after=FBREF_CACHE_TTLS,
+            allowable_codes=(200,)
+        )
+        self.session.headers.update(self.headers)
+        
+        # The adapter only retries failed connects (the request never reached
+        # FBref); HTTP errors go through _get_json's rate-limited retries
+        connect_retry = Retry(total=3, connect=3, read=0, status=0, backoff_factor=1)
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=connect_retry))
         
-        # Remove X-API-Key header if no API key provided
-        if not api_key:
-            self.headers.pop("X-API-Key", None)
+        # BigQuery loads run here so fetching the next season isn't held up by
+        # load jobs; flush_uploads() collects their results
+        self._upload_pool = ThreadPoolExecutor(max_workers=4)
+        self._pending_uploads: List[Future] = []
+        self._uploads_lock = threading.Lock()
         
-        # NWSL league configuration (will be populated after finding league_id)
-        self.nwsl_league_id = None
-        self.nwsl_country_id = None
+        # NWSL country/league IDs are discovered lazily (see nwsl_league_id).
+        # They never change, so reuse the ones an earlier run discovered
+        self.meta_cache_file = Path(settings.cache_dir) / "fbref_meta.json"
+        self._discovery_lock = threading.Lock()
+        self._discovered_ids: Optional[Tuple[Optional[str], Optional[str]]] = None
+        self._load_cached_meta()
     
-    def _enforce_rate_limit(self):
+    def close(self):
+        """Finish queued uploads and release pooled HTTP connections"""
+        self._upload_pool.shutdown(wait=True)
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _is_cached(self, url: str, params: Optional[Dict[str, Any]] = None) -> bool:
+        """Whether a GET would be answered from the cache without touching FBref"""
+        request = self.session.prepare_request(requests.Request("GET", url, params=params))
+        cached = self.session.cache.get_response(self.session.cache.create_key(request))
+        # Expired entries are revalidated over the network, so they still count
+        return cached is not None and not cached.is_expired
+    
+    def _season_url(self, endpoint: str, season_id: str) -> str:
+        """Fully encoded URL for one season of a league endpoint"""
+        return _build_season_url(self._urls[endpoint], self.nwsl_league_id, season_id)
+    
+    def _enforce_rate_limit(self, url: Optional[str] = None,
+                            params: Optional[Dict[str, Any]] = None):
         """Enforce FBref's 6 second rate limit between requests"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
+        # Cache hits never reach the API, so they don't need a slot
+        if url is not None and self._is_cached(url, params):
+            return
+        self._bucket.acquire()
+    
+    @staticmethod
+    def _to_frame(data: Any, dtypes: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """Build a frame with one column per top-level field of an endpoint's records"""
+        # Some payloads wrap the record list in an object, e.g. {"meta": ..., "stats": [...]}
+        if isinstance(data, dict):
+            data = next((value for value in data.values() if isinstance(value, list)), [data])
+        # max_level=0 keeps nested objects (meta_data, stats) as STRUCT columns,
+        # which the MCP servers query as e.g. meta_data.team_name
+        df = pd.json_normalize(data, max_level=0)
         
-        if time_since_last_request < self.rate_limit_seconds:
-            wait_time = self.rate_limit_seconds - time_since_last_request
-            logger.info(f"⏳ Rate limit: waiting {wait_time:.1f} seconds...")
-            time.sleep(wait_time)
+        # Pin known numeric fields so a season with nulls or numeric strings
+        # doesn't upload them as FLOAT/STRING; fields that won't convert are left as-is
+        for column, dtype in (dtypes or {}).items():
+            if column in df.columns:
+                try:
+                    df[column] = df[column].astype(dtype)
+                except (TypeError, ValueError):
+                    logger.debug(f"Leaving {column} as {df[column].dtype}")
+        return df
+    
+    @staticmethod
+    def _with_metadata(df: pd.DataFrame, season_id: str,
+                       ingestion_ts: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Tag a season's frame with its season_id and ingestion timestamp"""
+        # Categorical season_id stores one string plus int8 codes instead of a
+        # full-length object column; callers share one timestamp per run.
+        # Set in place: the frame is freshly built, and assign() would copy it
+        df['season_id'] = pd.Categorical([season_id] * len(df))
+        df['ingestion_date'] = ingestion_ts if ingestion_ts is not None else pd.Timestamp.now()
+        return df
+    
+    @staticmethod
+    def _parse(response: requests.Response) -> Any:
+        """Decode a JSON response body"""
+        # orjson parses the raw bytes directly, skipping the text decode
+        return orjson.loads(response.content)
+    
+    def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                  max_attempts: int = 5) -> Dict[str, Any]:
+        """GET a JSON endpoint, retrying transient failures with jittered backoff"""
+        for attempt in range(max_attempts):
+            self._enforce_rate_limit(url, params)
+            try:
+                response = self.session.get(url, params=params, timeout=30)
+                response.raise_for_status()
+                return self._parse(response)
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                status = e.response.status_code if e.response is not None else None
+                transient = status is None or status in TRANSIENT_STATUS_CODES
+                if not transient or attempt == max_attempts - 1:
+                    raise
+                
+                delay = min(30.0, 2 ** attempt * (1 + random.random() * 0.5))
+                retry_after = e.response.headers.get("Retry-After") if status == 429 else None
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+                
+                logger.warning(f"⚠️ {url} failed ({status or e}); retrying in {delay:.1f}s")
+                if status == 429:
+                    # Throttling applies to the whole API key, so hold back every
+                    # thread's next request, not just this retry
+                    self._bucket.defer(delay)
+                else:
+                    time.sleep(delay)
+    
+    def _load_cached_meta(self):
+        """Populate the NWSL country and league IDs from the on-disk cache"""
+        try:
+            meta = orjson.loads(self.meta_cache_file.read_bytes()).get(self.base_url, {})
+        except (OSError, ValueError):
+            return
         
-        self.last_request_time = time.time()
+        # Seed the cached properties so no discovery call is made
+        if meta.get("nwsl_league_id"):
+            self.nwsl_country_id = meta.get("nwsl_country_id")
+            self.nwsl_league_id = meta["nwsl_league_id"]
     
-    def find_nwsl_league_id(self) -> Optional[str]:
-        """Find NWSL league ID using the FBR API"""
+    def _save_cached_meta(self, country_id: Optional[str], league_id: str):
+        """Atomically persist the discovered IDs, keyed by base URL"""
+        try:
+            cache = orjson.loads(self.meta_cache_file.read_bytes())
+        except (OSError, ValueError):
+            cache = {}
+        
+        cache[self.base_url] = {
+            "nwsl_country_id": country_id,
+            "nwsl_league_id": league_id
+        }
+        
+        try:
+            self.meta_cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.meta_cache_file.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(cache))
+            os.replace(tmp_path, self.meta_cache_file)
+        except OSError as e:
+            logger.warning(f"Could not cache FBref IDs: {e}")
+    
+    @cached_property
+    def nwsl_league_id(self) -> Optional[str]:
+        """NWSL league ID, discovered once per client on first use"""
+        return self._nwsl_ids()[1]
+    
+    @cached_property
+    def nwsl_country_id(self) -> Optional[str]:
+        """Country code the NWSL is listed under"""
+        return self._nwsl_ids()[0]
+    
+    def _nwsl_ids(self) -> Tuple[Optional[str], Optional[str]]:
+        """(country code, league ID), looked up by the first caller only"""
+        # Concurrent fetchers wait here instead of each repeating the lookup
+        with self._discovery_lock:
+            if self._discovered_ids is None:
+                self._discovered_ids = self._discover_nwsl_ids()
+                country_id, league_id = self._discovered_ids
+                if league_id:
+                    self._save_cached_meta(country_id, league_id)
+            return self._discovered_ids
+    
+    def find_nwsl_league_id(self, refresh: bool = False) -> Optional[str]:
+        """Find NWSL league ID using the FBR API, reusing a cached ID unless refresh is set"""
+        if refresh:
+            with self._discovery_lock:
+                self._discovered_ids = None
+                self.__dict__.pop("nwsl_league_id", None)
+                self.__dict__.pop("nwsl_country_id", None)
+        return self.nwsl_league_id
+    
+    def _discover_nwsl_ids(self) -> Tuple[Optional[str], Optional[str]]:
+        """Look up the USA country code and NWSL league ID via the API"""
         try:
             # First, get countries to find USA
-            countries_url = f"{self.base_url}/countries"
+            countries_url = self._urls["countries"]
             logger.info(f"Fetching countries from: {countries_url}")
             
-            self._enforce_rate_limit()
-            response = requests.get(countries_url, headers=self.headers)
-            response.raise_for_status()
-            
-            response_data = response.json()
+            response_data = self._get_json(countries_url)
             countries = response_data.get("data", [])
             
             # Find USA
@@ -70,23 +344,18 @@ class FBrefAPIClient:
             for country in countries:
                 if country.get("country", "").lower() in ["usa", "united states", "united states of america"]:
                     usa_country_code = country.get("country_code")
-                    self.nwsl_country_id = usa_country_code
                     logger.info(f"Found USA country code: {usa_country_code}")
                     break
             
             if not usa_country_code:
                 logger.error("Could not find USA country code")
-                return None
+                return None, None
             
             # Now get leagues for USA
-            leagues_url = f"{self.base_url}/leagues"
+            leagues_url = self._urls["leagues"]
             logger.info(f"Fetching leagues from: {leagues_url}")
             
-            self._enforce_rate_limit()
-            response = requests.get(leagues_url, headers=self.headers, params={"country_code": usa_country_code})
-            response.raise_for_status()
-            
-            response_data = response.json()
+            response_data = self._get_json(leagues_url, params={"country_code": usa_country_code})
             league_data = response_data.get("data", [])
             
             # Find NWSL in domestic leagues
@@ -96,35 +365,28 @@ class FBrefAPIClient:
                     for league in leagues:
                         league_name = league.get("competition_name", "").lower()
                         if "nwsl" in league_name or "national women's soccer league" in league_name:
-                            self.nwsl_league_id = league.get("league_id")
-                            logger.info(f"Found NWSL league ID: {self.nwsl_league_id}")
-                            return self.nwsl_league_id
+                            league_id = league.get("league_id")
+                            logger.info(f"Found NWSL league ID: {league_id}")
+                            return usa_country_code, league_id
             
             logger.error("Could not find NWSL league ID")
-            return None
+            return usa_country_code, None
             
         except Exception as e:
             logger.error(f"Error finding NWSL league ID: {e}")
-            return None
+            return None, None
     
     def get_league_seasons(self) -> List[Dict]:
         """Get available seasons for NWSL"""
-        if not self.nwsl_league_id:
-            self.find_nwsl_league_id()
-        
         if not self.nwsl_league_id:
             logger.error("No NWSL league ID available")
             return []
         
         try:
-            url = f"{self.base_url}/league-seasons"
+            url = self._urls["league-seasons"]
             params = {"league_id": self.nwsl_league_id}
             
-            self._enforce_rate_limit()
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            
-            response_data = response.json()
+            response_data = self._get_json(url, params=params)
             seasons = response_data.get("data", [])
             logger.info(f"Found {len(seasons)} NWSL seasons")
             return seasons
@@ -133,221 +395,236 @@ class FBrefAPIClient:
             logger.error(f"Error fetching NWSL seasons: {e}")
             return []
     
-    def get_team_season_stats(self, season_id: str) -> pd.DataFrame:
-        """Get team season statistics"""
-        if not self.nwsl_league_id:
-            self.find_nwsl_league_id()
-        
+    def _fetch_endpoint(self, endpoint: str, season_id: str, label: str,
+                        ingestion_ts: Optional[pd.Timestamp] = None,
+                        dtypes: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """Fetch one season of a league endpoint as a tagged frame (empty on failure)"""
         try:
-            url = f"{self.base_url}/team-season-stats"
-            params = {
-                "league_id": self.nwsl_league_id,
-                "season_id": season_id
-            }
+            url = self._season_url(endpoint, season_id)
             
-            self._enforce_rate_limit()
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
+            # Build the frame straight from the payload so the parsed records
+            # can be freed before the metadata columns are added
+            df = self._to_frame(self._get_json(url).get("data", []), dtypes)
             
-            response_data = response.json()
-            data = response_data.get("data", [])
-            
-            if not data:
-                logger.warning(f"No team season stats for season {season_id}")
+            if df.empty:
+                logger.warning(f"No {label} for season {season_id}")
                 return pd.DataFrame()
             
-            df = pd.DataFrame(data)
-            df['season_id'] = season_id
-            df['ingestion_date'] = pd.Timestamp.now()
-            
-            return df
+            return self._with_metadata(df, season_id, ingestion_ts)
             
         except Exception as e:
-            logger.error(f"Error fetching team season stats: {e}")
+            logger.error(f"Error fetching {label}: {e}")
             return pd.DataFrame()
     
-    def get_player_season_stats(self, season_id: str) -> pd.DataFrame:
+    def get_team_season_stats(self, season_id: str,
+                              ingestion_ts: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Get team season statistics"""
+        return self._fetch_endpoint("team-season-stats", season_id, "team season stats",
+                                    ingestion_ts)
+    
+    def get_player_season_stats(self, season_id: str,
+                                ingestion_ts: Optional[pd.Timestamp] = None) -> pd.DataFrame:
         """Get player season statistics"""
-        if not self.nwsl_league_id:
-            self.find_nwsl_league_id()
-        
-        try:
-            url = f"{self.base_url}/player-season-stats"
-            params = {
-                "league_id": self.nwsl_league_id,
-                "season_id": season_id
-            }
-            
-            self._enforce_rate_limit()
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            
-            response_data = response.json()
-            data = response_data.get("data", [])
-            
-            if not data:
-                logger.warning(f"No player season stats for season {season_id}")
-                return pd.DataFrame()
-            
-            df = pd.DataFrame(data)
-            df['season_id'] = season_id
-            df['ingestion_date'] = pd.Timestamp.now()
-            
-            return df
-            
-        except Exception as e:
-            logger.error(f"Error fetching player season stats: {e}")
-            return pd.DataFrame()
+        return self._fetch_endpoint("player-season-stats", season_id, "player season stats",
+                                    ingestion_ts, PLAYER_SEASON_DTYPES)
     
-    def get_match_stats(self, season_id: str) -> pd.DataFrame:
+    def get_match_stats(self, season_id: str,
+                        ingestion_ts: Optional[pd.Timestamp] = None) -> pd.DataFrame:
         """Get match statistics and results"""
-        if not self.nwsl_league_id:
-            self.find_nwsl_league_id()
+        return self._fetch_endpoint("matches", season_id, "match data",
+                                    ingestion_ts, MATCH_DTYPES)
+    
+    def get_all_players_match_stats(self, season_id: str,
+                                    ingestion_ts: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Get detailed player match statistics for all players"""
+        return self._fetch_endpoint("all-players-match-stats", season_id, "all-players match stats",
+                                    ingestion_ts, PLAYER_SEASON_DTYPES)
+    
+    def _season_fetchers(self) -> Dict[str, Tuple[Callable[..., pd.DataFrame], str]]:
+        """Base table name -> (fetcher, label); the four endpoints are independent"""
+        return {
+            'nwsl_team_season_stats': (self.get_team_season_stats, "Team season stats"),
+            'nwsl_player_season_stats': (self.get_player_season_stats, "Player season stats"),
+            'nwsl_matches': (self.get_match_stats, "Match data"),
+            'nwsl_all_players_match_stats': (self.get_all_players_match_stats, "All players match stats"),
+        }
+    
+    def ingest_season_data(self, season_id: str,
+                           ingestion_ts: Optional[pd.Timestamp] = None,
+                           flush: bool = True) -> Dict[str, int]:
+        """Ingest all available data for a specific season
+        
+        With flush=False the BigQuery loads keep running in the background and
+        the caller collects their results later with flush_uploads().
+        """
+        logger.info(f"📅 Ingesting NWSL season {season_id} data from FBRef API...")
+        
+        if ingestion_ts is None:
+            ingestion_ts = pd.Timestamp.now()
+        
+        fetchers = {
+            f'{table_name}_{season_id}': fetcher
+            for table_name, fetcher in self._season_fetchers().items()
+        }
         
         try:
-            url = f"{self.base_url}/matches"
-            params = {
-                "league_id": self.nwsl_league_id,
-                "season_id": season_id
-            }
-            
-            self._enforce_rate_limit()
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            
-            response_data = response.json()
-            data = response_data.get("data", [])
-            
-            if not data:
-                logger.warning(f"No match data for season {season_id}")
-                return pd.DataFrame()
-            
-            df = pd.DataFrame(data)
-            df['season_id'] = season_id
-            df['ingestion_date'] = pd.Timestamp.now()
-            
-            return df
+            # Fetch concurrently (still paced by the rate limiter) and hand each
+            # frame to the upload pool as it arrives
+            with ThreadPoolExecutor(max_workers=len(fetchers)) as executor:
+                futures = {
+                    executor.submit(fetch, season_id, ingestion_ts): table_name
+                    for table_name, (fetch, _) in fetchers.items()
+                }
+                
+                for future in as_completed(futures):
+                    table_name = futures[future]
+                    self._queue_upload(future.result(), table_name, fetchers[table_name][1])
             
         except Exception as e:
-            logger.error(f"Error fetching match data: {e}")
-            return pd.DataFrame()
+            logger.error(f"Error ingesting season {season_id}: {e}")
+        
+        if flush:
+            return self.flush_uploads()
+        return {'tables_created': 0, 'total_rows': 0}
     
-    def get_all_players_match_stats(self, season_id: str) -> pd.DataFrame:
-        """Get detailed player match statistics for all players"""
-        if not self.nwsl_league_id:
-            self.find_nwsl_league_id()
+    def ingest_seasons(self, season_ids: List[str]) -> Dict[str, int]:
+        """Ingest several seasons into one combined table per endpoint
         
-        try:
-            url = f"{self.base_url}/all-players-match-stats"
-            params = {
-                "league_id": self.nwsl_league_id,
-                "season_id": season_id
+        Each endpoint's seasons are concatenated and loaded in a single job
+        into e.g. nwsl_player_season_stats, integer-range partitioned on the
+        season's starting year and clustered by season_id. The combined tables
+        are replaced on each run.
+        """
+        if not season_ids:
+            return {'tables_created': 0, 'total_rows': 0}
+        
+        # Every season in the run shares one ingestion timestamp
+        ingestion_ts = pd.Timestamp.now()
+        fetchers = self._season_fetchers()
+        
+        with ThreadPoolExecutor(max_workers=min(len(season_ids) * len(fetchers), 8)) as executor:
+            futures = {
+                table_name: [executor.submit(fetch, season_id, ingestion_ts) for season_id in season_ids]
+                for table_name, (fetch, _) in fetchers.items()
             }
             
-            self._enforce_rate_limit()
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            
-            response_data = response.json()
-            data = response_data.get("data", [])
-            
-            if not data:
-                logger.warning(f"No all-players match stats for season {season_id}")
-                return pd.DataFrame()
-            
-            df = pd.DataFrame(data)
-            df['season_id'] = season_id
-            df['ingestion_date'] = pd.Timestamp.now()
-            
-            return df
-            
-        except Exception as e:
-            logger.error(f"Error fetching all-players match stats: {e}")
-            return pd.DataFrame()
+            for table_name, season_futures in futures.items():
+                frames = [future.result() for future in season_futures]
+                frames = [df for df in frames if not df.empty]
+                if not frames:
+                    continue
+                
+                df = pd.concat(frames, ignore_index=True)
+                # Per-season categoricals with different categories concat to object
+                df['season_id'] = df['season_id'].astype('category')
+                # Partition key: the starting year of the season ("2024", "2023-2024"),
+                # so season filters prune to one partition
+                df['season'] = pd.to_numeric(
+                    df['season_id'].astype(str).str[:4], errors='coerce'
+                ).astype('Int64')
+                
+                self._queue_upload(
+                    df, table_name, f"{fetchers[table_name][1]} ({len(frames)} seasons)",
+                    range_partitioning=bigquery.RangePartitioning(
+                        field='season',
+                        range_=bigquery.PartitionRange(start=2000, end=2100, interval=1)
+                    ),
+                    clustering_fields=[field for field in ('season_id', 'team') if field in df.columns]
+                )
+        
+        return self.flush_uploads()
     
-    def ingest_season_data(self, season_id: str) -> Dict[str, int]:
-        """Ingest all available data for a specific season"""
-        logger.info(f"📅 Ingesting NWSL season {season_id} data from FBRef API...")
+    def _queue_upload(self, df: pd.DataFrame, table_name: str, label: str, **load_options):
+        """Load a frame on the background upload pool without waiting for it"""
+        if df.empty:
+            return
         
-        results = {'tables_created': 0, 'total_rows': 0}
+        def upload() -> Tuple[str, int]:
+            return label, self._upload_to_bigquery(df, table_name, **load_options)
         
-        try:
-            # Get team season stats
-            team_stats = self.get_team_season_stats(season_id)
-            if not team_stats.empty:
-                rows = self._upload_to_bigquery(team_stats, f'nwsl_team_season_stats_{season_id}')
-                if rows > 0:
-                    results['total_rows'] += rows
-                    results['tables_created'] += 1
-                    logger.info(f"✅ Team season stats: {rows} rows")
-            
-            # Get player season stats
-            player_stats = self.get_player_season_stats(season_id)
-            if not player_stats.empty:
-                rows = self._upload_to_bigquery(player_stats, f'nwsl_player_season_stats_{season_id}')
-                if rows > 0:
-                    results['total_rows'] += rows
-                    results['tables_created'] += 1
-                    logger.info(f"✅ Player season stats: {rows} rows")
-            
-            # Get match data
-            match_data = self.get_match_stats(season_id)
-            if not match_data.empty:
-                rows = self._upload_to_bigquery(match_data, f'nwsl_matches_{season_id}')
-                if rows > 0:
-                    results['total_rows'] += rows
-                    results['tables_created'] += 1
-                    logger.info(f"✅ Match data: {rows} rows")
-            
-            # Get all players match stats
-            all_player_match_stats = self.get_all_players_match_stats(season_id)
-            if not all_player_match_stats.empty:
-                rows = self._upload_to_bigquery(all_player_match_stats, f'nwsl_all_players_match_stats_{season_id}')
-                if rows > 0:
-                    results['total_rows'] += rows
-                    results['tables_created'] += 1
-                    logger.info(f"✅ All players match stats: {rows} rows")
-            
-        except Exception as e:
-            logger.error(f"Error ingesting season {season_id}: {e}")
+        with self._uploads_lock:
+            self._pending_uploads.append(self._upload_pool.submit(upload))
+    
+    def flush_uploads(self) -> Dict[str, int]:
+        """Wait for every queued BigQuery load and total up the results"""
+        with self._uploads_lock:
+            pending, self._pending_uploads = self._pending_uploads, []
+        
+        results = {'tables_created': 0, 'total_rows': 0}
+        for future in as_completed(pending):
+            label, rows = future.result()
+            if rows > 0:
+                results['total_rows'] += rows
+                results['tables_created'] += 1
+                logger.info(f"✅ {label}: {rows} rows")
         
         return results
     
-    def _upload_to_bigquery(self, df: pd.DataFrame, table_name: str) -> int:
+    def _upload_to_bigquery(self, df: pd.DataFrame, table_name: str,
+                            schema: Optional[List[bigquery.SchemaField]] = None,
+                            range_partitioning: Optional[bigquery.RangePartitioning] = None,
+                            clustering_fields: Optional[List[str]] = None) -> int:
         """Upload DataFrame to BigQuery"""
         
-        if df is None or len(df) == 0:
+        n_rows = 0 if df is None else df.shape[0]
+        if not n_rows:
             return 0
         
         try:
             # Clean column names for BigQuery
-            df.columns = [
-                col.replace(' ', '_')
-                   .replace('-', '_')
-                   .replace('.', '_')
-                   .replace('/', '_')
-                   .replace('%', '_pct')
-                   .replace('(', '')
-                   .replace(')', '')
-                   .replace('+', '_plus')
-                   .replace('±', '_pm')
-                   .lower()
-                for col in df.columns
-            ]
+            df.columns = sanitize_columns(df.columns)
+            
+            # Repetitive strings (team, position, nationality) become dictionary-
+            # encoded Parquet columns; nested record columns are left alone
+            for column in df.select_dtypes(include="object").columns:
+                values = df[column]
+                if (pd.api.types.infer_dtype(values, skipna=True) == "string"
+                        and values.nunique() < 0.5 * n_rows):
+                    df[column] = values.astype("category")
             
             table_id = f"{self.project_id}.{self.dataset_id}.{table_name}"
             
+            if range_partitioning is not None:
+                # WRITE_TRUNCATE can't change a table's partitioning, and these
+                # tables are fully replaced anyway: drop one left over from the
+                # old ingestion_date layout
+                try:
+                    existing = self.client.get_table(table_id)
+                except NotFound:
+                    existing = None
+                if existing is not None and existing.range_partitioning is None:
+                    logger.info(f"Recreating {table_name} with season partitioning")
+                    self.client.delete_table(table_id)
+            
+            # Convert to Arrow once and ship an in-memory Parquet file; Parquet
+            # carries its own schema, so BigQuery doesn't autodetect anything
+            buffer = io.BytesIO()
+            pq.write_table(
+                pa.Table.from_pandas(df, preserve_index=False),
+                buffer,
+                compression="snappy",
+                use_dictionary=True
+            )
+            buffer.seek(0)
+            
+            parquet_options = bigquery.ParquetOptions()
+            parquet_options.enable_list_inference = True
+            
             job_config = bigquery.LoadJobConfig(
                 write_disposition="WRITE_TRUNCATE",  # Replace table each time
-                autodetect=True,
-                create_disposition="CREATE_IF_NEEDED"
+                create_disposition="CREATE_IF_NEEDED",
+                source_format=bigquery.SourceFormat.PARQUET,
+                parquet_options=parquet_options,
+                schema=schema,
+                range_partitioning=range_partitioning,
+                clustering_fields=clustering_fields
             )
             
-            job = self.client.load_table_from_dataframe(df, table_id, job_config=job_config)
+            job = self.client.load_table_from_file(buffer, table_id, job_config=job_config)
             job.result()  # Wait for completion
             
-            logger.info(f"✅ Uploaded {len(df)} rows to {table_name}")
-            return len(df)
+            logger.info(f"✅ Uploaded {n_rows} rows to {table_name}")
+            return n_rows
             
         except Exception as e:
             logger.error(f"❌ Upload failed for {table_name}: {e}")
@@ -356,9 +633,11 @@ class FBrefAPIClient:
     def test_connection(self) -> bool:
         """Test connection to FBR API"""
         try:
-            url = f"{self.base_url}/countries"
+            url = self._urls["countries"]
             self._enforce_rate_limit()
-            response = requests.get(url, headers=self.headers)
+            # Bypass the cache so this really checks the API (and the key)
+            with self.session.cache_disabled():
+                response = self.session.get(url, timeout=30)
             
             if response.status_code == 401:
                 logger.warning("⚠️ FBR API requires authentication. Please provide API key.")
@@ -0,0 +1,46 @@
+"""Aggregate views over the season-partitioned nwsl_fbref.player_stats table.
+
+process_all_player_data.py creates each of these as a materialized view, and
+the MCP server runs the same SELECT inline when a view hasn't been created.
+"""
+
+from typing import Dict
+
+# View name -> SELECT body, formatted with project_id. Materialized views can't
+# sit on a logical view, so these read the base table, not player_stats_all_years.
+MATERIALIZED_VIEWS: Dict[str, str] = {
+    "team_season_stats": """
+    SELECT season,
+           Squad AS team,
+           SUM(PERF_Gls) AS total_goals,
+           SUM(PERF_Ast) AS total_assists,
+           SUM(EXP_xG) AS total_xg,
+           COUNT(*) AS squad_size
+    FROM `{project_id}.nwsl_fbref.player_stats`
+    GROUP BY season, Squad
+    """,
+    # CORR can't be maintained incrementally, so store the running sums it is
+    # built from and let the reader finish the Pearson formula
+    "season_correlation_sums": """
+    SELECT season,
+           COUNT(*) AS sample_size,
+           SUM(PERF_Gls) AS sum_goals,
+           SUM(EXP_xG) AS sum_xg,
+           SUM(PERF_Gls * PERF_Gls) AS sum_goals_sq,
+           SUM(EXP_xG * EXP_xG) AS sum_xg_sq,
+           SUM(PERF_Gls * EXP_xG) AS sum_goals_xg,
+           SUM(PERF_Ast) AS sum_assists,
+           SUM(EXP_xAG) AS sum_xa,
+           SUM(PERF_Ast * PERF_Ast) AS sum_assists_sq,
+           SUM(EXP_xAG * EXP_xAG) AS sum_xa_sq,
+           SUM(PERF_Ast * EXP_xAG) AS sum_assists_xa
+    FROM `{project_id}.nwsl_fbref.player_stats`
+    WHERE PT_Min > 450
+    GROUP BY season
+    """,
+}
+
+
+def view_select(name: str, project_id: str) -> str:
+    """SELECT body of a materialized view for the given project"""
+    return MATERIALIZED_VIEWS[name].format(project_id=project_id)
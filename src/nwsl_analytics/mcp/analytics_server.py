@@ -5,11 +5,19 @@ Provides advanced soccer analytics tools based on research questions
 
 import logging
 import asyncio
+import functools
+import hashlib
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 import pandas as pd
-from google.cloud import bigquery
+import pyarrow as pa
+from cachetools import TTLCache
+from google.api_core.exceptions import NotFound
+from google.cloud import bigquery, bigquery_storage
 import json
 
 from mcp.server import Server, NotificationOptions
@@ -17,6 +25,8 @@ from mcp.server.models import InitializationOptions
 import mcp.server.stdio
 import mcp.types as types
 
+from ..data.views import view_select
+
 # Add analytics modules to path
 analytics_path = Path(__file__).parent.parent.parent.parent / "analytics"
 sys.path.append(str(analytics_path))
@@ -33,16 +43,71 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# Below this many rows a Storage API read session costs more than it saves,
+# so small results (standings, team totals) stay on the REST download
+BQSTORAGE_MIN_ROWS = 1000
+
+# Repeat tool calls within this window are answered without hitting BigQuery
+QUERY_CACHE_TTL_SECONDS = 300
+
+# BigQuery calls block, so they run on their own pool instead of the event loop
+QUERY_POOL_WORKERS = 16
+
+# BigQuery types for the Python values handlers bind as query parameters
+_PARAM_TYPES = {str: "STRING", int: "INT64", float: "FLOAT64"}
+
+# Same nullable dtypes RowIterator.to_dataframe() would have produced
+_PANDAS_TYPES = {pa.int64(): pd.Int64Dtype(), pa.bool_(): pd.BooleanDtype()}
+
+def _format_value(value: Any, spec: str) -> str:
+    """Format an Arrow row value, which is None (not NaN) for SQL NULL"""
+    return "n/a" if value is None else format(value, spec)
+
+# Team name mappings for user-friendly queries
+_TEAM_MAPPINGS = {
+    'north carolina courage': 'Courage',
+    'nc courage': 'Courage',
+    'courage': 'Courage',
+    'chicago red stars': 'Red Stars',
+    'red stars': 'Red Stars',
+    'houston dash': 'Dash',
+    'dash': 'Dash',
+    'orlando pride': 'Pride',
+    'pride': 'Pride',
+    'portland thorns': 'Thorns',
+    'thorns': 'Thorns',
+    'washington spirit': 'Spirit',
+    'spirit': 'Spirit',
+    'gotham fc': 'Gotham FC',
+    'gotham': 'Gotham FC',
+    'kansas city current': 'Current',
+    'current': 'Current',
+    'san diego wave': 'Wave',
+    'wave': 'Wave',
+    'angel city': 'Angel City',
+    'racing louisville': 'Louisville',
+    'louisville': 'Louisville',
+    'seattle reign': 'Reign',
+    'reign': 'Reign',
+    'utah royals': 'Royals',
+    'royals': 'Royals',
+    'bay fc': 'Bay FC'
+}
+
 class NWSLAnalyticsServer:
     """Enhanced MCP Server for NWSL Analytics with research-based tools"""
     
     def __init__(self, project_id: str = "nwsl-data"):
         self.server = Server("nwsl-analytics-research")
         self.project_id = project_id
+        self._query_cache = TTLCache(maxsize=256, ttl=QUERY_CACHE_TTL_SECONDS)
+        self._query_cache_lock = threading.Lock()
+        self._query_pool = ThreadPoolExecutor(max_workers=QUERY_POOL_WORKERS, thread_name_prefix="bq-query")
         
         # Initialize analytics tools (with error handling)
         try:
             self.bigquery_client = bigquery.Client(project=project_id)
+            self.bqstorage_client = bigquery_storage.BigQueryReadClient()
             if ExpectedGoalsCalculator:
                 self.xg_calculator = ExpectedGoalsCalculator(project_id)
             if ShotQualityProfiler:
@@ -53,52 +118,90 @@ class NWSLAnalyticsServer:
         except Exception as e:
             logger.warning(f"Could not initialize BigQuery client: {e}")
             self.bigquery_client = None
+            self.bqstorage_client = None
             self.xg_calculator = None
             self.shot_profiler = None
             self.war_estimator = None
         
-        # Team name mappings for user-friendly queries
-        self.team_mappings = {
-            'north carolina courage': 'Courage',
-            'nc courage': 'Courage',
-            'courage': 'Courage',
-            'chicago red stars': 'Red Stars',
-            'red stars': 'Red Stars',
-            'houston dash': 'Dash',
-            'dash': 'Dash',
-            'orlando pride': 'Pride',
-            'pride': 'Pride',
-            'portland thorns': 'Thorns',
-            'thorns': 'Thorns',
-            'washington spirit': 'Spirit',
-            'spirit': 'Spirit',
-            'gotham fc': 'Gotham FC',
-            'gotham': 'Gotham FC',
-            'kansas city current': 'Current',
-            'current': 'Current',
-            'san diego wave': 'Wave',
-            'wave': 'Wave',
-            'angel city': 'Angel City',
-            'racing louisville': 'Louisville',
-            'louisville': 'Louisville',
-            'seattle reign': 'Reign',
-            'reign': 'Reign',
-            'utah royals': 'Royals',
-            'royals': 'Royals',
-            'bay fc': 'Bay FC'
-        }
-        
         # Register MCP tools, resources, and prompts
         self._register_tools()
         self._register_resources()
         self._register_prompts()
     
-    def _normalize_team_name(self, team_name: str) -> str:
+    def close(self):
+        """Let in-flight queries finish and release the query pool"""
+        self._query_pool.shutdown(wait=True)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _normalize_team_name(team_name: str) -> str:
         """Convert user-friendly team names to database Squad names"""
         if not team_name:
             return team_name
-        normalized = team_name.lower().strip()
-        return self.team_mappings.get(normalized, team_name)
+        return _TEAM_MAPPINGS.get(team_name.lower().strip(), team_name)
+    
+    def _query_table(self, query: str, params: Optional[Dict[str, Any]] = None) -> pa.Table:
+        """Run a query with optional @name parameters, serving repeats from the TTL cache"""
+        params = params or {}
+        digest = hashlib.blake2b(query.encode())
+        digest.update(repr(sorted(params.items())).encode())
+        # Keys carry the date so nothing cached survives past the day's data load
+        key = f"{date.today().isoformat()}:{digest.hexdigest()}"
+        with self._query_cache_lock:
+            table = self._query_cache.get(key)
+        if table is None:
+            table = self._download_query_table(query, params)
+            with self._query_cache_lock:
+                self._query_cache[key] = table
+        return table
+    
+    def _query_df(self, query: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Query results as a DataFrame, for handlers that filter or aggregate them"""
+        return self._query_table(query, params).to_pandas(types_mapper=_PANDAS_TYPES.get)
+    
+    def _query_rows(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Query results as plain dicts, for handlers that only format them as text"""
+        return self._query_table(query, params).to_pylist()
+    
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run a blocking call on the query pool without stalling other requests"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._query_pool, functools.partial(func, *args, **kwargs))
+    
+    async def _run_query_df(self, query: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Async _query_df for the tool handlers"""
+        return await self._run_blocking(self._query_df, query, params)
+    
+    async def _run_query_rows(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Async _query_rows for the tool handlers"""
+        return await self._run_blocking(self._query_rows, query, params)
+    
+    async def _run_view_query_rows(self, view: str, query: str,
+                                   params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Run a query whose {view} placeholder reads one of the materialized views
+        
+        Falls back to computing the view's own SELECT inline when
+        process_all_player_data.py hasn't created it in this project yet.
+        """
+        try:
+            return await self._run_query_rows(
+                query.format(view=f"`{self.project_id}.nwsl_fbref.{view}`"), params
+            )
+        except NotFound:
+            logger.warning(f"Materialized view nwsl_fbref.{view} not found; aggregating player_stats instead")
+            inline = f"({view_select(view, self.project_id)})"
+            return await self._run_query_rows(query.format(view=inline), params)
+    
+    def _download_query_table(self, query: str, params: Dict[str, Any]) -> pa.Table:
+        """Run a query, downloading large results through the BigQuery Storage API"""
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter(name, _PARAM_TYPES[type(value)], value)
+            for name, value in params.items()
+        ])
+        rows = self.bigquery_client.query(query, job_config=job_config).result()
+        if rows.total_rows is not None and rows.total_rows >= BQSTORAGE_MIN_ROWS:
+            return rows.to_arrow(bqstorage_client=self.bqstorage_client)
+        return rows.to_arrow(create_bqstorage_client=False)
     
     def _register_tools(self):
         """Register all NWSL research analytics tools"""
@@ -222,7 +325,7 @@ class NWSLAnalyticsServer:
             if f"{self.project_id}." not in query:
                 query = query.replace(f"{dataset}.", f"{self.project_id}.{dataset}.")
             
-            df = self.bigquery_client.query(query).to_dataframe()
+            df = await self._run_query_df(query)
             
             # Format results
             result = f"Query Results ({len(df)} rows):\n\n"
@@ -249,49 +352,54 @@ class NWSLAnalyticsServer:
             
             if analysis_type == "player_xg":
                 team_name = self._normalize_team_name(args.get("team")) if args.get("team") else None
-                df = self.xg_calculator.get_player_xg_analysis(
+                df = await self._run_blocking(
+                    self.xg_calculator.get_player_xg_analysis,
                     player_name=args.get("player_name"),
                     season=season,
-                    team=team_name
+                    team=team_name,
+                    limit=15
                 )
                 
-                result = f"Player xG Analysis for {season}:\n\n"
-                result += "Top Performers by Expected Goals:\n"
-                for _, player in df.head(15).iterrows():
-                    result += f"• {player['player_name']} ({player['team']}): {player['expected_goals']:.2f} xG, {player['goals']} goals (conversion: {player['goal_conversion_rate']:.2f})\n"
+                lines = [
+                    f"• {p.player_name} ({p.team}): {p.expected_goals:.2f} xG, {p.goals} goals (conversion: {p.goal_conversion_rate:.2f})"
+                    for p in df.head(15).itertuples(index=False)
+                ]
+                result = f"Player xG Analysis for {season}:\n\nTop Performers by Expected Goals:\n" + "\n".join(lines) + "\n"
                 
             elif analysis_type == "league_patterns":
-                patterns = self.xg_calculator.analyze_goal_generation_patterns(season)
-                
-                result = f"League-wide Goal Generation Patterns ({season}):\n\n"
-                result += "League Metrics:\n"
-                for metric, value in patterns['league_metrics'].items():
-                    result += f"• {metric.replace('_', ' ').title()}: {value}\n"
+                patterns = await self._run_blocking(self.xg_calculator.analyze_goal_generation_patterns, season)
                 
-                result += "\nPosition Breakdown:\n"
-                for breakdown in patterns.get('position_metrics', {}).get('position_breakdown', []):
-                    result += f"• {breakdown}\n"
+                lines = [f"League-wide Goal Generation Patterns ({season}):\n", "League Metrics:"]
+                lines += [f"• {metric.replace('_', ' ').title()}: {value}" for metric, value in patterns['league_metrics'].items()]
+                lines.append("\nPosition Breakdown:")
+                lines += [f"• {breakdown}" for breakdown in patterns.get('position_metrics', {}).get('position_breakdown', [])]
+                result = "\n".join(lines) + "\n"
             
             elif analysis_type == "overperformers":
-                df = self.xg_calculator.find_xg_overperformers(season, args.get("min_minutes", 900))
+                df = await self._run_blocking(self.xg_calculator.find_xg_overperformers, season, args.get("min_minutes", 900), limit=10)
                 
-                result = f"xG Over/Under-performers ({season}):\n\n"
-                result += "Biggest Overperformers:\n"
                 overperformers = df[df['goals_vs_expected'] > 0].head(10)
-                for _, player in overperformers.iterrows():
-                    result += f"• {player['player_name']}: +{player['goals_vs_expected']:.2f} vs expected ({player['performance_category']})\n"
-                
-                result += "\nBiggest Underperformers:\n"
                 underperformers = df[df['goals_vs_expected'] < 0].tail(5)
-                for _, player in underperformers.iterrows():
-                    result += f"• {player['player_name']}: {player['goals_vs_expected']:.2f} vs expected ({player['performance_category']})\n"
+                lines = [f"xG Over/Under-performers ({season}):\n", "Biggest Overperformers:"]
+                lines += [
+                    f"• {p.player_name}: +{p.goals_vs_expected:.2f} vs expected ({p.performance_category})"
+                    for p in overperformers.itertuples(index=False)
+                ]
+                lines.append("\nBiggest Underperformers:")
+                lines += [
+                    f"• {p.player_name}: {p.goals_vs_expected:.2f} vs expected ({p.performance_category})"
+                    for p in underperformers.itertuples(index=False)
+                ]
+                result = "\n".join(lines) + "\n"
             
             elif analysis_type == "team_efficiency":
-                df = self.xg_calculator.calculate_team_xg_efficiency(season)
+                df = await self._run_blocking(self.xg_calculator.calculate_team_xg_efficiency, season, limit=10)
                 
-                result = f"Team xG Efficiency ({season}):\n\n"
-                for _, team in df.head(10).iterrows():
-                    result += f"• {team['team_name']}: {team['team_conversion_rate']:.2f} conversion rate, {team['goals_vs_expected']:.1f} vs expected\n"
+                lines = [
+                    f"• {t.team_name}: {t.team_conversion_rate:.2f} conversion rate, {t.goals_vs_expected:.1f} vs expected"
+                    for t in df.head(10).itertuples(index=False)
+                ]
+                result = f"Team xG Efficiency ({season}):\n\n" + "\n".join(lines) + "\n"
             
             return [types.TextContent(type="text", text=result)]
             
@@ -310,37 +418,43 @@ class NWSLAnalyticsServer:
             season = args["season"]
             
             if analysis_type == "player_profiles":
-                df = self.shot_profiler.analyze_shooting_profiles(season, args.get("min_minutes", 450))
+                df = await self._run_blocking(self.shot_profiler.analyze_shooting_profiles, season, args.get("min_minutes", 450), limit=15)
                 
-                result = f"Player Shooting Profiles ({season}):\n\n"
-                result += "Top Shot Profiles:\n"
-                for _, player in df.head(15).iterrows():
-                    result += f"• {player['player_name']} ({player['team']}): {player['xg_per_90']:.2f} xG/90, {player['shooter_type']}, {player['finishing_quality']}\n"
+                lines = [
+                    f"• {p.player_name} ({p.team}): {p.xg_per_90:.2f} xG/90, {p.shooter_type}, {p.finishing_quality}"
+                    for p in df.head(15).itertuples(index=False)
+                ]
+                result = f"Player Shooting Profiles ({season}):\n\nTop Shot Profiles:\n" + "\n".join(lines) + "\n"
             
             elif analysis_type == "positional_patterns":
-                patterns = self.shot_profiler.analyze_positional_shooting_patterns(season)
-                
-                result = f"Positional Shooting Patterns ({season}):\n\n"
-                for pos_data in patterns['position_data']:
-                    result += f"• {pos_data['position_group']}: {pos_data['avg_xg_per_90']:.2f} avg xG/90, {pos_data['position_conversion_rate']:.2f} conversion rate\n"
+                patterns = await self._run_blocking(self.shot_profiler.analyze_positional_shooting_patterns, season)
                 
-                result += f"\nSummary:\n"
-                for key, value in patterns['summary'].items():
-                    result += f"• {key.replace('_', ' ').title()}: {value}\n"
+                lines = [f"Positional Shooting Patterns ({season}):\n"]
+                lines += [
+                    f"• {pos_data['position_group']}: {pos_data['avg_xg_per_90']:.2f} avg xG/90, {pos_data['position_conversion_rate']:.2f} conversion rate"
+                    for pos_data in patterns['position_data']
+                ]
+                lines.append("\nSummary:")
+                lines += [f"• {key.replace('_', ' ').title()}: {value}" for key, value in patterns['summary'].items()]
+                result = "\n".join(lines) + "\n"
             
             elif analysis_type == "quality_leaders":
-                df = self.shot_profiler.find_shot_quality_leaders(season, args.get("min_shots", 2.0))
+                df = await self._run_blocking(self.shot_profiler.find_shot_quality_leaders, season, args.get("min_shots", 2.0), limit=10)
                 
-                result = f"Shot Quality Leaders ({season}):\n\n"
-                for _, player in df.head(10).iterrows():
-                    result += f"• {player['player_name']}: {player['estimated_xg_per_shot']:.3f} xG/shot, {player['volume_category']}\n"
+                lines = [
+                    f"• {p.player_name}: {p.estimated_xg_per_shot:.3f} xG/shot, {p.volume_category}"
+                    for p in df.head(10).itertuples(index=False)
+                ]
+                result = f"Shot Quality Leaders ({season}):\n\n" + "\n".join(lines) + "\n"
             
             elif analysis_type == "team_styles":
-                df = self.shot_profiler.analyze_team_shooting_styles(season)
+                df = await self._run_blocking(self.shot_profiler.analyze_team_shooting_styles, season, limit=10)
                 
-                result = f"Team Shooting Styles ({season}):\n\n"
-                for _, team in df.head(10).iterrows():
-                    result += f"• {team['team_name']}: {team['attacking_style']}, {team['finishing_quality']} finishing\n"
+                lines = [
+                    f"• {t.team_name}: {t.attacking_style}, {t.finishing_quality} finishing"
+                    for t in df.head(10).itertuples(index=False)
+                ]
+                result = f"Team Shooting Styles ({season}):\n\n" + "\n".join(lines) + "\n"
             
             return [types.TextContent(type="text", text=result)]
             
@@ -359,33 +473,40 @@ class NWSLAnalyticsServer:
             season = args["season"]
             
             if analysis_type == "replacement_baselines":
-                baselines = self.war_estimator.calculate_replacement_baselines(season, args.get("min_minutes", 450))
+                baselines = await self._run_blocking(self.war_estimator.calculate_replacement_baselines, season, args.get("min_minutes", 450))
                 
-                result = f"Replacement Level Baselines ({season}):\n\n"
-                for position, stats in baselines['replacement_baselines'].items():
-                    result += f"• {position.title()}: {stats['replacement_contribution_per_90']:.3f} contributions/90 (from {stats['total_players']} players)\n"
+                lines = [
+                    f"• {position.title()}: {stats['replacement_contribution_per_90']:.3f} contributions/90 (from {stats['total_players']} players)"
+                    for position, stats in baselines['replacement_baselines'].items()
+                ]
+                result = f"Replacement Level Baselines ({season}):\n\n" + "\n".join(lines) + "\n"
             
             elif analysis_type == "player_war":
-                df = self.war_estimator.calculate_player_war_estimates(season, args.get("min_minutes", 450))
+                df = await self._run_blocking(self.war_estimator.calculate_player_war_estimates, season, args.get("min_minutes", 450))
                 
-                result = f"Player WAR Estimates ({season}):\n\n"
-                result += "Top WAR Performers:\n"
-                for _, player in df.head(15).iterrows():
-                    result += f"• {player['player_name']} ({player['team']}): {player['estimated_wins_above_replacement']:.2f} WAR ({player['value_tier']})\n"
+                lines = [
+                    f"• {p.player_name} ({p.team}): {p.estimated_wins_above_replacement:.2f} WAR ({p.value_tier})"
+                    for p in df.head(15).itertuples(index=False)
+                ]
+                result = f"Player WAR Estimates ({season}):\n\nTop WAR Performers:\n" + "\n".join(lines) + "\n"
             
             elif analysis_type == "team_construction":
-                df = self.war_estimator.analyze_team_roster_construction(season)
+                df = await self._run_blocking(self.war_estimator.analyze_team_roster_construction, season)
                 
-                result = f"Team Roster Construction ({season}):\n\n"
-                for _, team in df.head(10).iterrows():
-                    result += f"• {team['team']}: {team['total_war']:.1f} total WAR, {team['roster_style']}\n"
+                lines = [
+                    f"• {t.team}: {t.total_war:.1f} total WAR, {t.roster_style}"
+                    for t in df.head(10).itertuples(index=False)
+                ]
+                result = f"Team Roster Construction ({season}):\n\n" + "\n".join(lines) + "\n"
             
             elif analysis_type == "undervalued_players":
-                df = self.war_estimator.find_undervalued_players(season, args.get("min_war", 0.5))
+                df = await self._run_blocking(self.war_estimator.find_undervalued_players, season, args.get("min_war", 0.5))
                 
-                result = f"High-Value Players ({season}):\n\n"
-                for _, player in df.head(15).iterrows():
-                    result += f"• {player['player_name']} ({player['team']}): {player['estimated_wins_above_replacement']:.2f} WAR, {player['war_per_90']:.3f} WAR/90\n"
+                lines = [
+                    f"• {p.player_name} ({p.team}): {p.estimated_wins_above_replacement:.2f} WAR, {p.war_per_90:.3f} WAR/90"
+                    for p in df.head(15).itertuples(index=False)
+                ]
+                result = f"High-Value Players ({season}):\n\n" + "\n".join(lines) + "\n"
             
             return [types.TextContent(type="text", text=result)]
             
@@ -411,21 +532,26 @@ class NWSLAnalyticsServer:
             SELECT player_name, team, goals, assists, minutes_played, 
                    expected_goals, expected_assists, shots_on_target_pct
             FROM `{self.project_id}.nwsl_fbref.player_stats_all_years`
-            WHERE season = {int(season)}
+            WHERE season = @season
             """
+            params = {"season": int(season), "limit": int(limit)}
             
             if player_name:
-                query += f" AND LOWER(player_name) LIKE '%{player_name.lower()}%'"
+                query += " AND LOWER(player_name) LIKE @player_pattern"
+                params["player_pattern"] = f"%{player_name.lower()}%"
             if team_name:
-                query += f" AND team = '{team_name}'"
+                query += " AND team = @team"
+                params["team"] = team_name
             
-            query += f" ORDER BY goals DESC LIMIT {limit}"
+            query += " ORDER BY goals DESC LIMIT @limit"
             
-            df = self.bigquery_client.query(query).to_dataframe()
+            rows = await self._run_query_rows(query, params)
             
-            result = f"Player Statistics ({season}):\n\n"
-            for _, player in df.iterrows():
-                result += f"• {player['player_name']} ({player['team']}): {player['goals']} goals, {player['assists']} assists, {player['minutes_played']} minutes\n"
+            lines = [
+                f"• {p['player_name']} ({p['team']}): {p['goals']} goals, {p['assists']} assists, {p['minutes_played']} minutes"
+                for p in rows
+            ]
+            result = f"Player Statistics ({season}):\n\n" + "\n".join(lines) + "\n"
             
             return [types.TextContent(type="text", text=result)]
             
@@ -440,28 +566,27 @@ class NWSLAnalyticsServer:
             season = args["season"]
             team_name = args.get("team_name")
             
-            # Aggregate player stats to team level
-            query = f"""
-            SELECT team, 
-                   SUM(goals) as total_goals,
-                   SUM(assists) as total_assists,
-                   SUM(expected_goals) as total_xg,
-                   COUNT(*) as squad_size
-            FROM `{self.project_id}.nwsl_fbref.player_stats_all_years`
-            WHERE season = {int(season)}
+            # Team totals are precomputed by the team_season_stats materialized view
+            query = """
+            SELECT team, total_goals, total_assists, total_xg, squad_size
+            FROM {view}
+            WHERE season = @season
             """
+            params = {"season": int(season)}
             
             if team_name:
-                normalized_team = self._normalize_team_name(team_name)
-                query += f" AND team = '{normalized_team}'"
+                query += " AND team = @team"
+                params["team"] = self._normalize_team_name(team_name)
             
-            query += " GROUP BY team ORDER BY total_goals DESC"
+            query += " ORDER BY total_goals DESC"
             
-            df = self.bigquery_client.query(query).to_dataframe()
+            rows = await self._run_view_query_rows("team_season_stats", query, params)
             
-            result = f"Team Statistics ({season}):\n\n"
-            for _, team in df.iterrows():
-                result += f"• {team['team']}: {team['total_goals']} goals, {team['total_xg']:.1f} xG, {team['squad_size']} players\n"
+            lines = [
+                f"• {t['team']}: {t['total_goals']} goals, {_format_value(t['total_xg'], '.1f')} xG, {t['squad_size']} players"
+                for t in rows
+            ]
+            result = f"Team Statistics ({season}):\n\n" + "\n".join(lines) + "\n"
             
             return [types.TextContent(type="text", text=result)]
             
@@ -475,22 +600,23 @@ class NWSLAnalyticsServer:
                 return [types.TextContent(type="text", text="Error: Season parameter is required. Please specify a season (e.g., '2025', '2024', '2023')")]
             season = args["season"]
             
-            # Calculate standings from team stats
-            query = f"""
+            # Calculate standings from the team_season_stats materialized view
+            query = """
             SELECT team,
-                   SUM(goals) as goals_for,
-                   COUNT(*) as games_played
-            FROM `{self.project_id}.nwsl_fbref.player_stats_all_years`
-            WHERE season = {int(season)}
-            GROUP BY team
+                   total_goals as goals_for,
+                   squad_size as games_played
+            FROM {view}
+            WHERE season = @season
             ORDER BY goals_for DESC
             """
             
-            df = self.bigquery_client.query(query).to_dataframe()
+            rows = await self._run_view_query_rows("team_season_stats", query, {"season": int(season)})
             
-            result = f"League Standings ({season}) - by Goals:\n\n"
-            for i, team in df.iterrows():
-                result += f"{i+1}. {team['team']}: {team['goals_for']} goals\n"
+            lines = [
+                f"{rank}. {t['team']}: {t['goals_for']} goals"
+                for rank, t in enumerate(rows, start=1)
+            ]
+            result = f"League Standings ({season}) - by Goals:\n\n" + "\n".join(lines) + "\n"
             
             return [types.TextContent(type="text", text=result)]
             
@@ -540,21 +666,32 @@ class NWSLAnalyticsServer:
             analysis_type = args.get("analysis_type", "player_performance")
             season = args["season"]
             
-            query = f"""
+            # Pearson correlation from the running sums in season_correlation_sums
+            query = """
             SELECT 
-                CORR(goals, expected_goals) as goals_xg_correlation,
-                CORR(assists, expected_assists) as assists_xa_correlation,
-                COUNT(*) as sample_size
-            FROM `{self.project_id}.nwsl_fbref.player_stats_all_years`
-            WHERE season = {int(season)} AND minutes_played > 450
+                SAFE_DIVIDE(
+                    sample_size * sum_goals_xg - sum_goals * sum_xg,
+                    SQRT((sample_size * sum_goals_sq - sum_goals * sum_goals)
+                         * (sample_size * sum_xg_sq - sum_xg * sum_xg))
+                ) as goals_xg_correlation,
+                SAFE_DIVIDE(
+                    sample_size * sum_assists_xa - sum_assists * sum_xa,
+                    SQRT((sample_size * sum_assists_sq - sum_assists * sum_assists)
+                         * (sample_size * sum_xa_sq - sum_xa * sum_xa))
+                ) as assists_xa_correlation,
+                sample_size
+            FROM {view}
+            WHERE season = @season
             """
             
-            df = self.bigquery_client.query(query).to_dataframe()
+            rows = await self._run_view_query_rows("season_correlation_sums", query, {"season": int(season)})
+            if not rows:
+                return [types.TextContent(type="text", text=f"No correlation data for season {season} (no players with 450+ minutes).")]
             
             result = f"Statistical Correlations ({season}):\n\n"
-            row = df.iloc[0]
-            result += f"• Goals vs xG correlation: {row['goals_xg_correlation']:.3f}\n"
-            result += f"• Assists vs xA correlation: {row['assists_xa_correlation']:.3f}\n"
+            row = rows[0]
+            result += f"• Goals vs xG correlation: {_format_value(row['goals_xg_correlation'], '.3f')}\n"
+            result += f"• Assists vs xA correlation: {_format_value(row['assists_xa_correlation'], '.3f')}\n"
             result += f"• Sample size: {row['sample_size']} players\n"
             
             return [types.TextContent(type="text", text=result)]
@@ -570,8 +707,10 @@ class NWSLAnalyticsServer:
         team2 = args.get("team2")
         season = args["season"]
         
-        team1_stats = await self._get_team_stats({"season": season, "team_name": team1})
-        team2_stats = await self._get_team_stats({"season": season, "team_name": team2})
+        team1_stats, team2_stats = await asyncio.gather(
+            self._get_team_stats({"season": season, "team_name": team1}),
+            self._get_team_stats({"season": season, "team_name": team2})
+        )
         
         result = f"Team Comparison ({season}):\n\n"
         result += f"{team1}:\n{team1_stats[0].text}\n"
@@ -593,24 +732,30 @@ class NWSLAnalyticsServer:
             FROM `{self.project_id}.nwsl_fbref.player_stats_all_years`
             WHERE 1=1
             """
+            params = {"limit": int(limit)}
             
             if player_name:
-                query += f" AND LOWER(player_name) LIKE '%{player_name.lower()}%'"
+                query += " AND LOWER(player_name) LIKE @player_pattern"
+                params["player_pattern"] = f"%{player_name.lower()}%"
             if position:
-                query += f" AND position = '{position}'"
+                query += " AND position = @position"
+                params["position"] = position
             if nationality:
-                query += f" AND nationality = '{nationality}'"
+                query += " AND nationality = @nationality"
+                params["nationality"] = nationality
             if team_name:
-                normalized_team = self._normalize_team_name(team_name)
-                query += f" AND team = '{normalized_team}'"
+                query += " AND team = @team"
+                params["team"] = self._normalize_team_name(team_name)
             
-            query += f" ORDER BY player_name LIMIT {limit}"
+            query += " ORDER BY player_name LIMIT @limit"
             
-            df = self.bigquery_client.query(query).to_dataframe()
+            rows = await self._run_query_rows(query, params)
             
-            result = "NWSL Player Roster:\n\n"
-            for _, player in df.iterrows():
-                result += f"• {player['player_name']} ({player['team']}) - {player['position']}, {player['nationality']}\n"
+            lines = [
+                f"• {p['player_name']} ({p['team']}) - {p['position']}, {p['nationality']}"
+                for p in rows
+            ]
+            result = "NWSL Player Roster:\n\n" + "\n".join(lines) + "\n"
             
             return [types.TextContent(type="text", text=result)]
             
@@ -627,11 +772,13 @@ class NWSLAnalyticsServer:
             ORDER BY team
             """
             
-            df = self.bigquery_client.query(query).to_dataframe()
+            rows = await self._run_query_rows(query)
             
-            result = "NWSL Teams:\n\n"
-            for _, team in df.iterrows():
-                result += f"• {team['team']} ({team['squad_size']} players across all seasons)\n"
+            lines = [
+                f"• {t['team']} ({t['squad_size']} players across all seasons)"
+                for t in rows
+            ]
+            result = "NWSL Teams:\n\n" + "\n".join(lines) + "\n"
             
             return [types.TextContent(type="text", text=result)]
             
@@ -698,13 +845,14 @@ class NWSLAnalyticsServer:
                 ROUND(PERF_Gls / NULLIF(EXP_xG, 0), 2) as goal_conversion_rate,
                 ROUND(EXP_xG + EXP_xAG, 2) as total_expected_contributions
             FROM `{self.project_id}.nwsl_fbref.player_stats_all_years`
-            WHERE Squad = '{normalized_team}' 
-                AND season = {int(season)} 
-                AND PT_Min >= {min_minutes}
+            WHERE Squad = @team 
+                AND season = @season 
+                AND PT_Min >= @min_minutes
             ORDER BY {sort_column} DESC
             """
+            params = {"team": normalized_team, "season": int(season), "min_minutes": float(min_minutes)}
             
-            df = self.bigquery_client.query(query).to_dataframe()
+            df = await self._run_query_df(query, params)
             
             if df.empty:
                 return [types.TextContent(type="text", text=f"No players found for {team} in {season} with minimum {min_minutes} minutes played.")]
@@ -712,12 +860,13 @@ class NWSLAnalyticsServer:
             result = f"{team} Roster Analysis ({season}):\n"
             result += f"Players with {min_minutes}+ minutes (sorted by {sort_by}):\n\n"
             
-            for _, player in df.iterrows():
-                conversion = player['goal_conversion_rate'] if pd.notna(player['goal_conversion_rate']) else 0.0
-                result += f"• {player['player_name']} ({player['position']}): "
-                result += f"{player['goals']}G + {player['assists']}A = {player['total_contributions']} contributions, "
-                result += f"{player['expected_goals']:.1f}xG + {player['expected_assists']:.1f}xA, "
-                result += f"{player['minutes_played']:.0f} mins, {conversion:.2f} conversion rate\n"
+            result += "".join(
+                f"• {p.player_name} ({p.position}): "
+                f"{p.goals}G + {p.assists}A = {p.total_contributions} contributions, "
+                f"{p.expected_goals:.1f}xG + {p.expected_assists:.1f}xA, "
+                f"{p.minutes_played:.0f} mins, {p.goal_conversion_rate if pd.notna(p.goal_conversion_rate) else 0.0:.2f} conversion rate\n"
+                for p in df.itertuples(index=False)
+            )
             
             result += f"\nTeam Totals: {df['goals'].sum()}G + {df['assists'].sum()}A, "
             result += f"{df['expected_goals'].sum():.1f}xG + {df['expected_assists'].sum():.1f}xA"
@@ -738,6 +887,7 @@ class NWSLAnalyticsServer:
             analysis_type = args["analysis_type"]
             position_focus = args.get("position_focus")
             normalized_team = self._normalize_team_name(team)
+            params = {"team": normalized_team, "season": int(season)}
             
             if analysis_type == "current_form":
                 # Get players with recent activity, weighted by recency
@@ -759,11 +909,11 @@ class NWSLAnalyticsServer:
                         ELSE 'Limited Minutes'
                     END as playing_time_status
                 FROM `{self.project_id}.nwsl_fbref.player_stats_all_years`
-                WHERE Squad = '{normalized_team}' AND season = {int(season)}
+                WHERE Squad = @team AND season = @season
                 ORDER BY PT_Min DESC
                 """
                 
-                df = self.bigquery_client.query(query).to_dataframe()
+                df = await self._run_query_df(query, params)
                 
                 result = f"{team} Current Form Analysis ({season}):\n\n"
                 result += "**PLAYING TIME BREAKDOWN:**\n"
@@ -772,10 +922,11 @@ class NWSLAnalyticsServer:
                     players = df[df['playing_time_status'] == status]
                     if not players.empty:
                         result += f"\n{status} ({len(players)} players):\n"
-                        for _, player in players.iterrows():
-                            conv_rate = player['conversion_rate'] if pd.notna(player['conversion_rate']) else 0.0
-                            result += f"• {player['player_name']} ({player['position']}): {player['minutes_played']:.0f} mins, "
-                            result += f"{player['goals']}G+{player['assists']}A, {conv_rate:.2f} conversion\n"
+                        result += "".join(
+                            f"• {p.player_name} ({p.position}): {p.minutes_played:.0f} mins, "
+                            f"{p.goals}G+{p.assists}A, {p.conversion_rate if pd.notna(p.conversion_rate) else 0.0:.2f} conversion\n"
+                            for p in players.itertuples(index=False)
+                        )
                 
                 # Add team summary
                 total_goals = df['goals'].sum()
@@ -814,7 +965,7 @@ class NWSLAnalyticsServer:
                             ORDER BY (PERF_Gls + PERF_Ast + EXP_xG + EXP_xAG) DESC, PT_Min DESC
                         ) as position_rank
                     FROM `{self.project_id}.nwsl_fbref.player_stats_all_years`
-                    WHERE Squad = '{normalized_team}' AND season = {int(season)} AND PT_Min >= 180
+                    WHERE Squad = @team AND season = @season AND PT_Min >= 180
                 )
                 SELECT * FROM position_rankings 
                 WHERE (position_group = 'GK' AND position_rank <= 1)
@@ -824,7 +975,7 @@ class NWSLAnalyticsServer:
                 ORDER BY position_group, position_rank
                 """
                 
-                df = self.bigquery_client.query(query).to_dataframe()
+                df = await self._run_query_df(query, params)
                 
                 result = f"{team} Optimal Starting XI ({season}):\n\n"
                 
@@ -832,9 +983,11 @@ class NWSLAnalyticsServer:
                     players = df[df['position_group'] == pos_group]
                     if not players.empty:
                         result += f"**{pos_group}:**\n"
-                        for _, player in players.iterrows():
-                            result += f"• {player['Player']} ({player['Pos']}): {player['contributions']:.0f} contributions, "
-                            result += f"{player['expected_contributions']:.1f} expected, {player['PT_Min']:.0f} mins\n"
+                        result += "".join(
+                            f"• {p.Player} ({p.Pos}): {p.contributions:.0f} contributions, "
+                            f"{p.expected_contributions:.1f} expected, {p.PT_Min:.0f} mins\n"
+                            for p in players.itertuples(index=False)
+                        )
                         result += "\n"
                 
             elif analysis_type == "underperformers":
@@ -849,24 +1002,26 @@ class NWSLAnalyticsServer:
                     PERF_Gls - EXP_xG as goal_difference,
                     ROUND((PERF_Gls - EXP_xG) / NULLIF(EXP_xG, 0) * 100, 1) as underperformance_pct
                 FROM `{self.project_id}.nwsl_fbref.player_stats_all_years`
-                WHERE Squad = '{normalized_team}' 
-                    AND season = {int(season)} 
+                WHERE Squad = @team 
+                    AND season = @season 
                     AND PT_Min >= 300
                     AND EXP_xG >= 1.0
                     AND (PERF_Gls - EXP_xG) < -1.0
                 ORDER BY (PERF_Gls - EXP_xG) ASC
                 """
                 
-                df = self.bigquery_client.query(query).to_dataframe()
+                df = await self._run_query_df(query, params)
                 
                 result = f"{team} Underperforming Players ({season}):\n\n"
                 if df.empty:
                     result += "No significant underperformers found (good sign!).\n"
                 else:
                     result += "Players significantly below expected goals:\n"
-                    for _, player in df.iterrows():
-                        result += f"• {player['Player']} ({player['Pos']}): {player['goals']} goals from {player['expected_goals']:.1f} xG "
-                        result += f"({player['goal_difference']:.1f} difference, {player['underperformance_pct']:.0f}% below expectation)\n"
+                    result += "".join(
+                        f"• {p.Player} ({p.Pos}): {p.goals} goals from {p.expected_goals:.1f} xG "
+                        f"({p.goal_difference:.1f} difference, {p.underperformance_pct:.0f}% below expectation)\n"
+                        for p in df.itertuples(index=False)
+                    )
             
             return [types.TextContent(type="text", text=result)]
             
@@ -1079,19 +1234,22 @@ async def main():
     """Run the NWSL Analytics MCP Server"""
     server = NWSLAnalyticsServer()
     
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="nwsl-analytics-research",
-                server_version="1.0.0",
-                capabilities=server.server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={}
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server.server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="nwsl-analytics-research",
+                    server_version="1.0.0",
+                    capabilities=server.server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={}
+                    )
                 )
             )
-        )
+    finally:
+        server.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -69,6 +69,14 @@ async def startup_event():
         traceback.print_exc()
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the MCP server's query threads on shutdown"""
+    # The basic fallback server has no pool to release
+    close = getattr(mcp_server, "close", None)
+    if close:
+        close()
+
 @app.get("/")
 async def root():
     """Root endpoint with server information"""
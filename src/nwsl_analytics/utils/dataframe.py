@@ -0,0 +1,42 @@
+"""DataFrame helpers shared by the ingestion scripts."""
+
+from typing import Any, Dict, List
+
+import pandas as pd
+import pyarrow as pa
+
+# Single-pass translation table for BigQuery-safe column names
+_TRANS = str.maketrans({
+    ' ': '_',
+    '-': '_',
+    '.': '_',
+    '/': '_',
+    '(': '',
+    ')': '',
+    '%': '_pct',
+    '+': '_plus',
+    '±': '_pm',
+    '#': 'num',
+})
+
+
+def sanitize_columns(index: pd.Index) -> pd.Index:
+    """Clean column names for BigQuery (e.g. 'Gls/90 (%)' -> 'gls_90_pct')"""
+    # soccerdata stat tables use two-level headers, e.g. ('Performance', 'Gls')
+    if isinstance(index, pd.MultiIndex):
+        index = index.map(lambda levels: '_'.join(str(level) for level in levels if level))
+    return (
+        index.astype(str)
+        .str.translate(_TRANS)
+        .str.lower()
+        .str.replace(r'_+', '_', regex=True)
+        .str.strip('_')
+    )
+
+
+def records_to_frame(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Build an Arrow-backed DataFrame from a list of JSON records"""
+    # pa.array infers one struct type over every record, so keys missing
+    # from the first record still become columns
+    table = pa.Table.from_struct_array(pa.array(records))
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
@@ -0,0 +1,28 @@
+"""HTTP helpers shared by the ingestion scripts."""
+
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional, Union
+
+import requests_cache
+
+HTTP_CACHE_PATH = Path.home() / ".cache" / "nwsl" / "http"
+
+
+def install_http_cache(
+    cache_path: Optional[Union[str, Path]] = None,
+    expire_after: timedelta = timedelta(days=1),
+) -> None:
+    """Serve repeated GETs from an on-disk SQLite cache
+
+    Patches requests globally, so FBrefAPIClient, soccerdata scrapers and
+    the probe scripts all share the cache.
+    """
+    path = Path(cache_path or HTTP_CACHE_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    requests_cache.install_cache(
+        str(path),
+        backend='sqlite',
+        expire_after=expire_after,
+        allowable_codes=(200,),
+    )